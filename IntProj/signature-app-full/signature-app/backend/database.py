@@ -1,22 +1,79 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from collections import Counter
+from contextvars import ContextVar
 from dotenv import load_dotenv
 import os
+import time
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./signature_app.db")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")  # Optional read replica
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
 
-# Handle SQLite for development
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+def _connect_args(url: str) -> dict:
+    # Handle SQLite for development
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+engine = create_engine(DATABASE_URL, connect_args=_connect_args(DATABASE_URL))
+read_engine = (
+    create_engine(DATABASE_READ_URL, connect_args=_connect_args(DATABASE_READ_URL))
+    if DATABASE_READ_URL else engine
+)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
+# Counts of read routing decisions, exposed at /metrics/db
+routing_stats = Counter()
+
+# Users who wrote recently -> wall-clock deadline until which their reads stay on the primary.
+# This only covers the current process; ReadAfterMiddleware also hands the
+# deadline to the client as a signed token so other API nodes honour it.
+_recent_writers = {}
+
+# Deadlines marked while handling the current request, set up by ReadAfterMiddleware
+request_writes: ContextVar = ContextVar("request_writes", default=None)
+
+
+def mark_recent_write(user_id: str) -> float:
+    """Pin a user's reads to the primary briefly so they see their own writes despite replica lag."""
+    now = time.time()
+    deadline = now + READ_YOUR_WRITES_SECONDS
+    _recent_writers[user_id] = deadline
+    if len(_recent_writers) > 10000:
+        for key, until in list(_recent_writers.items()):
+            if until < now:
+                del _recent_writers[key]
+    writes = request_writes.get()
+    if writes is not None:
+        writes[user_id] = deadline
+    return deadline
+
+
+def choose_read_route(user_id: str = None, force_primary: bool = False, client_sticky: bool = False) -> str:
+    """
+    Decide where a read-only request goes and record the decision.
+    `client_sticky` means the client presented a valid read-after token
+    from a write handled on any node.
+    """
+    if read_engine is engine:
+        route = "primary_no_replica"
+    elif force_primary:
+        route = "primary_forced"
+    elif client_sticky or (user_id and _recent_writers.get(user_id, 0) > time.time()):
+        route = "primary_sticky"
+    else:
+        route = "replica"
+    routing_stats[route] += 1
+    return route
+
 
 def get_db():
     """Dependency to get DB session."""
@@ -27,6 +84,36 @@ def get_db():
         db.close()
 
 
+# Columns added to tables that already existed; create_all never alters an existing table
+ADDED_COLUMNS = [
+    ("documents", "page_geometry"),
+    ("documents", "optimized_file_path"),
+    ("documents", "file_size"),
+    ("documents", "optimized_file_size"),
+    ("signatures", "recipient_id"),
+]
+
+
+def _add_missing_columns():
+    """Add columns from ADDED_COLUMNS that an older database doesn't have yet."""
+    existing = inspect(engine)
+    for table_name, column_name in ADDED_COLUMNS:
+        if column_name in {c["name"] for c in existing.get_columns(table_name)}:
+            continue
+        table = Base.metadata.tables[table_name]
+        column = table.c[column_name]
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=engine.dialect)}"
+        for fk in column.foreign_keys:
+            ddl += f" REFERENCES {fk.column.table.name} ({fk.column.name})"
+        with engine.begin() as conn:
+            conn.execute(text(ddl))
+        for index in table.indexes:
+            if column_name in index.columns:
+                index.create(bind=engine, checkfirst=True)
+        print(f"🛠️  Added column {table_name}.{column_name}")
+
+
 def create_tables():
-    """Create all tables on startup."""
+    """Create all tables on startup and add columns introduced since they were created."""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
@@ -0,0 +1,437 @@
+"""
+End-to-end load generator for the signing workflow. Each virtual user
+registers, logs in and then runs a weighted mix of flows:
+
+    owner   upload -> place N signatures -> finalize -> wait for job -> download -> audit
+    link    upload -> send link -> sign with token -> finalize -> wait for job -> download -> audit
+    browse  list documents -> search -> page geometry -> audit
+
+Per-step throughput and p50/p95/p99 latency are printed at the end.
+
+In-process (no server needed; the app runs on this event loop through an
+ASGI transport, with finalize workers as threads and a throwaway SQLite DB
+unless DATABASE_URL is set):
+
+    python loadtest.py --users 20 --iterations 5
+
+Against a running server (start `python worker.py` processes for finalize):
+
+    python loadtest.py --base-url http://localhost:8000 --users 50 --mix owner=5,link=4,browse=1
+
+Use --json to save results and compare runs, e.g. worker counts or a
+route before and after moving it from `async def` to `def`.
+
+--compare runs the in-process test twice, finalizing in the API process
+(JOBS_RUN_IN_API=true, no workers) and in --workers worker threads, and
+prints the two side by side:
+
+    python loadtest.py --compare --users 20 --iterations 5
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Stats:
+    """Latencies and error counts per step name."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, step: str, seconds: float, ok: bool):
+        if ok:
+            self.latencies[step].append(seconds)
+        else:
+            self.errors[step] += 1
+
+    @staticmethod
+    def percentile(sorted_values: List[float], pct: float) -> float:
+        """Nearest-rank percentile."""
+        if not sorted_values:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    def summary(self) -> List[dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = []
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[step])
+            rows.append({
+                "step": step,
+                "ok": len(values),
+                "errors": self.errors[step],
+                "throughput_per_s": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(self.percentile(values, 50) * 1000, 1),
+                "p95_ms": round(self.percentile(values, 95) * 1000, 1),
+                "p99_ms": round(self.percentile(values, 99) * 1000, 1),
+                "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+            })
+        return rows
+
+
+_pdf_cache: Dict[int, bytes] = {}
+
+
+def make_pdf(pages: int) -> bytes:
+    """A text PDF with `pages` pages, built once per size."""
+    if pages not in _pdf_cache:
+        import fitz
+
+        doc = fitz.open()
+        for i in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(
+                fitz.Rect(72, 72, 540, 720),
+                f"Master services agreement, page {i + 1}. "
+                + "The counterparty shall indemnify and hold harmless the company. " * 20,
+                fontsize=10,
+            )
+        _pdf_cache[pages] = doc.tobytes(garbage=3, deflate=True)
+        doc.close()
+    return _pdf_cache[pages]
+
+
+def make_signature(fmt: str) -> dict:
+    """Signature payload fields for a drawn signature as vector strokes or a PNG."""
+    if fmt == "vector":
+        values = [20, 70] + [v for i in range(80) for v in (3, round(6 * math.cos(i / 4)))]
+        return {"signature_type": "drawn", "signature_data": "strokes:280,140,2.5;" + ",".join(map(str, values))}
+
+    import base64
+    import io
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGBA", (560, 280), (0, 0, 0, 0))
+    points = [(40 + i * 6, 140 + 60 * math.sin(i / 4)) for i in range(80)]
+    ImageDraw.Draw(img).line(points, fill=(26, 21, 16, 255), width=5)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return {
+        "signature_type": "drawn",
+        "signature_data": "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+    }
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, args: argparse.Namespace, index: int):
+        self.client = client
+        self.stats = stats
+        self.args = args
+        self.rng = random.Random(args.seed + index)
+        self.email = f"load-{args.run_id}-{index}@example.com"
+        self.headers: Dict[str, str] = {}
+        self.document_ids: List[str] = []
+
+    async def call(self, step: str, method: str, url: str, expect=(200, 201, 202, 204), **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(step, time.perf_counter() - start, ok=False)
+            raise StepFailed(f"{step}: {e}")
+        ok = response.status_code in expect
+        self.stats.record(step, time.perf_counter() - start, ok=ok)
+        if not ok:
+            raise StepFailed(f"{step}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def call_json(self, step: str, method: str, url: str, **kwargs) -> dict:
+        response = await self.call(step, method, url, **kwargs)
+        try:
+            return response.json()
+        except ValueError:
+            raise StepFailed(f"{step}: non-JSON response {response.text[:200]}")
+
+    async def login(self):
+        password = "load-test-password"
+        await self.call("register", "POST", "/api/auth/register",
+                        json={"email": self.email, "full_name": "Load Test", "password": password})
+        body = await self.call_json("login", "POST", "/api/auth/login",
+                                    json={"email": self.email, "password": password})
+        self.headers = {"Authorization": f"Bearer {body['access_token']}"}
+
+    async def upload(self) -> dict:
+        pages = self.rng.choice(self.args.pdf_pages)
+        doc = await self.call_json(
+            f"upload[{pages}p]", "POST", "/api/docs/upload", headers=self.headers,
+            files={"file": (f"agreement_{pages}p.pdf", make_pdf(pages), "application/pdf")},
+        )
+        self.document_ids.append(doc["id"])
+        return doc
+
+    def placement(self, doc: dict, i: int) -> dict:
+        return {
+            "document_id": doc["id"],
+            "signer_name": "Load Test",
+            "signer_email": self.email,
+            "page_number": 1 + i % doc["page_count"],
+            "x_position": self.rng.uniform(5, 65),
+            "y_position": self.rng.uniform(5, 85),
+            "width": 25,
+            "height": 8,
+            **make_signature(self.args.signature_format),
+        }
+
+    async def finalize_and_fetch(self, doc: dict):
+        accepted = await self.call_json("finalize", "POST", "/api/signatures/finalize", headers=self.headers,
+                                        json={"document_id": doc["id"]})
+        job_id = accepted["job_id"]
+
+        # Time from enqueue until a worker has produced the signed PDF. Polls
+        # go through call_json so a 5xx or garbled reply fails only this flow
+        start = time.perf_counter()
+        deadline = start + self.args.job_timeout
+        while True:
+            try:
+                job = await self.call_json("job_status", "GET", f"/api/jobs/{job_id}", headers=self.headers)
+            except StepFailed:
+                self.stats.record("finalize_job", time.perf_counter() - start, ok=False)
+                raise
+            if job.get("status") in ("succeeded", "failed") or time.perf_counter() > deadline:
+                break
+            await asyncio.sleep(self.args.poll_interval)
+        ok = job.get("status") == "succeeded"
+        self.stats.record("finalize_job", time.perf_counter() - start, ok=ok)
+        if not ok:
+            raise StepFailed(f"finalize_job: {job.get('status')} {job.get('last_error')}")
+
+        await self.call("download_signed", "GET", f"/api/docs/{doc['id']}/download?signed=true", headers=self.headers)
+        await self.call("audit", "GET", f"/api/audit/{doc['id']}", headers=self.headers)
+
+    async def owner_flow(self):
+        doc = await self.upload()
+        for i in range(self.args.signatures):
+            await self.call("place_signature", "POST", "/api/signatures", headers=self.headers,
+                            json=self.placement(doc, i))
+        await self.finalize_and_fetch(doc)
+
+    async def link_flow(self):
+        doc = await self.upload()
+        link = await self.call_json("send_link", "POST", "/api/docs/send-link", headers=self.headers,
+                                    json={"document_id": doc["id"], "signer_email": f"signer-{uuid.uuid4().hex[:8]}@example.com"})
+        token = link["signing_token"]
+        await self.call("sign_with_token", "POST", "/api/signatures/sign-with-token", params={"token": token},
+                        json=self.placement(doc, 0))
+        await self.finalize_and_fetch(doc)
+
+    async def browse_flow(self):
+        await self.call("list_documents", "GET", "/api/docs", headers=self.headers)
+        await self.call("search", "GET", "/api/docs/search", headers=self.headers, params={"q": "indemnify"})
+        if self.document_ids:
+            doc_id = self.rng.choice(self.document_ids)
+            await self.call("page_geometry", "GET", f"/api/docs/{doc_id}/pages", headers=self.headers)
+            await self.call("audit", "GET", f"/api/audit/{doc_id}", headers=self.headers)
+
+    async def run(self):
+        try:
+            await self.login()
+        except StepFailed as e:
+            print(f"  ! {self.email}: {e}", file=sys.stderr)
+            return
+        flows = {"owner": self.owner_flow, "link": self.link_flow, "browse": self.browse_flow}
+        names, weights = zip(*self.args.mix.items())
+        for _ in range(self.args.iterations):
+            name = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                await flows[name]()
+                self.stats.record(f"flow:{name}", time.perf_counter() - start, ok=True)
+            except StepFailed as e:
+                self.stats.record(f"flow:{name}", time.perf_counter() - start, ok=False)
+                if self.args.verbose:
+                    print(f"  ! {self.email}: {e}", file=sys.stderr)
+
+
+@asynccontextmanager
+async def in_process_client(workers: int):
+    """Run the app through httpx's ASGI transport, with job workers as threads."""
+    if not os.getenv("DATABASE_URL"):
+        tmp = tempfile.mkdtemp(prefix="signflow-load-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/load.db"
+        os.environ.setdefault("UPLOAD_DIR", f"{tmp}/uploads")
+        print(f"Using throwaway database in {tmp}")
+
+    from main import app
+    from services.job_service import run_pending_jobs, WORKER_POLL_SECONDS
+
+    stop = threading.Event()
+
+    def worker_loop(n: int):
+        while not stop.is_set():
+            if not run_pending_jobs(worker_id=f"loadtest-{n}"):
+                stop.wait(min(WORKER_POLL_SECONDS, 0.05))
+
+    async with app.router.lifespan_context(app):
+        threads = [threading.Thread(target=worker_loop, args=(n,), daemon=True) for n in range(workers)]
+        for t in threads:
+            t.start()
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+                yield client
+        finally:
+            stop.set()
+            for t in threads:
+                t.join(timeout=10)
+
+
+@asynccontextmanager
+async def remote_client(base_url: str, users: int):
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        yield client
+
+
+def print_report(stats: Stats, args: argparse.Namespace):
+    rows = stats.summary()
+    elapsed = stats.finished - stats.started
+    total = sum(r["ok"] for r in rows if not r["step"].startswith("flow:") and r["step"] != "finalize_job")
+    print(f"\n{args.label or 'run'}: {args.users} users x {args.iterations} iterations in {elapsed:.1f}s "
+          f"({total / elapsed:.1f} req/s overall)\n")
+    header = f"{'step':<22}{'ok':>7}{'err':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['step']:<22}{r['ok']:>7}{r['errors']:>6}{r['throughput_per_s']:>9}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("owner", "link", "browse"):
+            raise argparse.ArgumentTypeError(f"unknown flow '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_load_test(args: argparse.Namespace):
+    stats = Stats()
+    if args.base_url:
+        client_context = remote_client(args.base_url, args.users)
+    else:
+        client_context = in_process_client(args.workers)
+
+    async with client_context as client:
+        for pages in args.pdf_pages:
+            make_pdf(pages)
+        stats.started = time.perf_counter()
+        users = [VirtualUser(client, stats, args, i) for i in range(args.users)]
+        await asyncio.gather(*(u.run() for u in users))
+        stats.finished = time.perf_counter()
+
+    print_report(stats, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "label": args.label,
+                "config": {k: v for k, v in vars(args).items() if k not in ("json",)},
+                "elapsed_s": round(stats.finished - stats.started, 3),
+                "steps": stats.summary(),
+            }, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+# (label, JOBS_RUN_IN_API, worker threads; None means --workers)
+COMPARE_MODES = [("jobs in API", "true", 0), ("worker threads", "false", None)]
+COMPARE_COLUMNS = [("req/s", "throughput_per_s"), ("p50 ms", "p50_ms"), ("p95 ms", "p95_ms"), ("err", "errors")]
+
+
+def print_comparison(runs: List[dict]):
+    steps = {r["step"]: {} for run in runs for r in run["steps"]}
+    for i, run in enumerate(runs):
+        for r in run["steps"]:
+            steps[r["step"]][i] = r
+    width = 9 * len(COMPARE_COLUMNS)
+    print("\n" + " " * 22 + "".join(f"{run['label']:>{width}}" for run in runs))
+    header = f"{'step':<22}" + "".join(f"{name:>9}" for _ in runs for name, _ in COMPARE_COLUMNS)
+    print(header)
+    print("-" * len(header))
+    for step in sorted(steps):
+        cells = []
+        for i in range(len(runs)):
+            row = steps[step].get(i)
+            cells += [f"{row[key] if row else '-':>9}" for _, key in COMPARE_COLUMNS]
+        print(f"{step:<22}" + "".join(cells))
+    print(f"{'elapsed s':<22}" + "".join(f"{run['elapsed_s']:>{width}}" for run in runs))
+
+
+def run_comparison(args: argparse.Namespace, argv: List[str]):
+    """
+    Run the in-process test once per finalize mode, each in a fresh process
+    since JOBS_RUN_IN_API is read when the app is imported.
+    """
+    if args.base_url:
+        sys.exit("--compare runs the app in-process; it can't switch a running server's JOBS_RUN_IN_API")
+    argv = [a for a in argv if a != "--compare"]
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="signflow-compare-") as tmp:
+        for i, (label, in_api, workers) in enumerate(COMPARE_MODES):
+            path = os.path.join(tmp, f"run{i}.json")
+            # Later flags win, so these override any --label/--json/--workers in argv
+            command = [sys.executable, os.path.abspath(__file__), *argv, "--label", label, "--json", path,
+                       "--workers", str(args.workers if workers is None else workers)]
+            print(f"▶️  {label} (JOBS_RUN_IN_API={in_api})")
+            subprocess.run(command, env={**os.environ, "JOBS_RUN_IN_API": in_api}, check=True)
+            with open(path) as f:
+                runs.append(json.load(f))
+
+    print_comparison(runs)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": runs}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the signing workflow end to end.")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="Flows run by each user")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("owner=5,link=4,browse=1"),
+                        help="Flow weights, e.g. owner=5,link=4,browse=1")
+    parser.add_argument("--signatures", type=int, default=3, help="Signatures placed per owner flow")
+    parser.add_argument("--pdf-pages", type=lambda v: [int(p) for p in v.split(",")], default=[1, 5, 25],
+                        help="Page counts to pick from for uploads")
+    parser.add_argument("--signature-format", choices=["vector", "png"], default="vector")
+    parser.add_argument("--workers", type=int, default=2, help="In-process finalize worker threads")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="Job status poll interval (s)")
+    parser.add_argument("--job-timeout", type=float, default=120, help="Give up waiting on a finalize job after (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", help="Name for this run in the report/JSON")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Print failed steps")
+    parser.add_argument("--compare", action="store_true",
+                        help="Run in-process with JOBS_RUN_IN_API and with worker threads, side by side")
+    args = parser.parse_args()
+    args.run_id = uuid.uuid4().hex[:8]
+    try:
+        if args.compare:
+            run_comparison(args, sys.argv[1:])
+        else:
+            asyncio.run(run_load_test(args))
+    except KeyboardInterrupt:
+        print("🛑 Load test stopped")
@@ -4,8 +4,11 @@ from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
 
-from database import create_tables
-from routers import auth, documents, signatures, audit
+from database import create_tables, routing_stats, DATABASE_READ_URL
+from middleware.db_routing import ReadAfterMiddleware
+from services.event_service import channel as event_channel
+from services.job_service import JOBS_RUN_IN_API
+from routers import auth, documents, signatures, audit, jobs, uploads, campaigns
 
 
 @asynccontextmanager
@@ -15,7 +18,11 @@ async def lifespan(app: FastAPI):
     os.makedirs(upload_dir, exist_ok=True)
     create_tables()
     print("✅ Database tables created")
+    if not JOBS_RUN_IN_API:
+        print("ℹ️  Finalize jobs are run by worker.py — start at least one worker or set JOBS_RUN_IN_API=true")
+    await event_channel.start()
     yield
+    await event_channel.stop()
     print("🛑 Shutting down...")
 
 
@@ -38,13 +45,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Read-After", "X-DB-Route"],
 )
+app.add_middleware(ReadAfterMiddleware)
 
 # Register routers
 app.include_router(auth.router)
 app.include_router(documents.router)
 app.include_router(signatures.router)
 app.include_router(audit.router)
+app.include_router(jobs.router)
+app.include_router(uploads.router)
+app.include_router(campaigns.router)
 
 
 @app.get("/", tags=["Health"])
@@ -60,3 +72,9 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics/db", tags=["Health"])
+async def db_metrics():
+    """Read routing decisions since process start (replica vs. primary and why)."""
+    return {"read_replica_configured": bool(DATABASE_READ_URL), "read_routing": dict(routing_stats)}
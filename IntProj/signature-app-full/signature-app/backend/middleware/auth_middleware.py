@@ -1,25 +1,23 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Callable, Optional
 from database import get_db
-from services.auth_service import decode_token, get_user_by_id
+from middleware.db_routing import get_read_db
+from services.auth_service import decode_stream_token, decode_token, get_user_by_id
 from models.user import User
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Dependency: extract and validate JWT, return current user."""
+def _authenticate(db: Session, token: Optional[str], decode: Callable = decode_token) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token_data = decode_token(credentials.credentials)
+    token_data = decode(token) if token else None
     if not token_data or not token_data.user_id:
         raise credentials_exception
 
@@ -28,3 +26,31 @@ async def get_current_user(
         raise credentials_exception
 
     return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """Dependency: extract and validate JWT, return current user."""
+    return _authenticate(db, credentials.credentials)
+
+
+async def get_current_user_read(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_read_db),
+) -> User:
+    """Like get_current_user, but looks the user up through the read-routed session."""
+    return _authenticate(db, credentials.credentials)
+
+
+async def get_current_user_for_stream(
+    token: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Dependency for EventSource streams: browsers cannot set headers on
+    EventSource, so the client passes a short-lived stream token from
+    POST /api/docs/events/token as ?token=. Access tokens are not accepted.
+    """
+    return _authenticate(db, token, decode_stream_token)
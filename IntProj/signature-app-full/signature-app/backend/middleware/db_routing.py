@@ -0,0 +1,95 @@
+import math
+from fastapi import Depends, Header, Response
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import MutableHeaders
+from typing import Optional
+from database import SessionLocal, ReadSessionLocal, choose_read_route, request_writes
+from services.auth_service import ALGORITHM, SECRET_KEY, decode_token
+
+optional_security = HTTPBearer(auto_error=False)
+
+# Separate key so a read-after token can never pass as an access token
+_READ_AFTER_KEY = f"{SECRET_KEY}:read-after"
+
+
+def create_read_after_token(user_id: str, deadline: float) -> str:
+    return jwt.encode({"sub": user_id, "exp": math.ceil(deadline)}, _READ_AFTER_KEY, algorithm=ALGORITHM)
+
+
+def read_after_is_valid(token: Optional[str], user_id: Optional[str]) -> bool:
+    """True if the token was issued for this user and its deadline hasn't passed (exp is checked by decode)."""
+    if not token or not user_id:
+        return False
+    try:
+        return jwt.decode(token, _READ_AFTER_KEY, algorithms=[ALGORITHM]).get("sub") == user_id
+    except JWTError:
+        return False
+
+
+class ReadAfterMiddleware:
+    """
+    Returns the read-your-writes deadline recorded by mark_recent_write during
+    a request as a signed `X-Read-After` header. The client echoes it back, so
+    its next reads stay on the primary whichever API node serves them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = {}
+        reset_token = request_writes.set(writes)
+
+        async def send_with_read_after(message):
+            if message["type"] == "http.response.start" and writes:
+                user_id, deadline = list(writes.items())[-1]
+                MutableHeaders(scope=message).append("X-Read-After", create_read_after_token(user_id, deadline))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_read_after)
+        finally:
+            request_writes.reset(reset_token)
+
+
+def get_read_route(
+    response: Response,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    x_read_consistency: Optional[str] = Header(None),
+    x_read_after: Optional[str] = Header(None),
+) -> str:
+    """
+    Route a read-only request: the replica, unless the caller wrote recently
+    (read-your-writes, from this node's memory or an echoed X-Read-After
+    token) or asks for `X-Read-Consistency: primary`. The JWT is only decoded
+    here, not verified against the DB, since it only picks a connection.
+    """
+    token_data = decode_token(credentials.credentials) if credentials else None
+    user_id = token_data.user_id if token_data else None
+    route = choose_read_route(
+        user_id=user_id,
+        force_primary=(x_read_consistency or "").lower() == "primary",
+        client_sticky=read_after_is_valid(x_read_after, user_id),
+    )
+    response.headers["X-DB-Route"] = route
+    return route
+
+
+def get_read_sessionmaker(route: str = Depends(get_read_route)) -> sessionmaker:
+    """For reads that outlive the request (streamed exports) and open their own session."""
+    return ReadSessionLocal if route == "replica" else SessionLocal
+
+
+def get_read_db(session_factory: sessionmaker = Depends(get_read_sessionmaker)):
+    """Dependency for read-only routes: a session on the replica or primary, see get_read_route."""
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -2,5 +2,14 @@ from .user import User
 from .document import Document, DocumentStatus
 from .signature import Signature, SignatureType
 from .audit_log import AuditLog
+from .job import Job, JobStatus
+from .document_event import DocumentEvent
+from .upload_session import UploadSession, UploadSessionStatus, UploadChunk
+from .campaign import Campaign, CampaignRecipient, RecipientStatus
+from .document_text import DocumentText
 
-__all__ = ["User", "Document", "DocumentStatus", "Signature", "SignatureType", "AuditLog"]
+__all__ = [
+    "User", "Document", "DocumentStatus", "Signature", "SignatureType", "AuditLog",
+    "Job", "JobStatus", "DocumentEvent", "UploadSession", "UploadSessionStatus", "UploadChunk",
+    "Campaign", "CampaignRecipient", "RecipientStatus", "DocumentText",
+]
@@ -9,7 +9,7 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    document_id = Column(String, ForeignKey("documents.id"), nullable=False)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=True)
     event_type = Column(String, nullable=False)  # uploaded, viewed, signed, finalized, link_sent
     event_detail = Column(Text, nullable=True)
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+import enum
+from database import Base
+
+
+class RecipientStatus(str, enum.Enum):
+    PENDING = "pending"
+    SIGNED = "signed"
+    FINALIZED = "finalized"
+    EXPIRED = "expired"
+
+
+class Campaign(Base):
+    """
+    One template document sent to many recipients. Every recipient signs the
+    same stored base file; per-recipient PDFs are only produced at finalize.
+    Progress counters are kept here so they never require scanning recipients.
+    """
+    __tablename__ = "campaigns"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False)  # Shared template
+    title = Column(String, nullable=False)
+    recipient_count = Column(Integer, default=0)
+    signed_count = Column(Integer, default=0)  # Includes recipients since finalized
+    finalized_count = Column(Integer, default=0)
+    expired_count = Column(Integer, default=0)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    template = relationship("Document", back_populates="campaigns")
+    recipients = relationship("CampaignRecipient", back_populates="campaign", cascade="all, delete-orphan")
+
+
+class CampaignRecipient(Base):
+    __tablename__ = "campaign_recipients"
+    # Recipient listings and finalize batches filter by campaign and status together
+    __table_args__ = (Index("ix_campaign_recipients_campaign_status", "campaign_id", "status"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)
+    email = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    signing_token = Column(String, unique=True, nullable=False)
+    status = Column(SAEnum(RecipientStatus), default=RecipientStatus.PENDING)
+    signed_file_path = Column(String, nullable=True)  # Storage key, set at finalize
+    signed_at = Column(DateTime(timezone=True), nullable=True)
+    finalized_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    campaign = relationship("Campaign", back_populates="recipients")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Enum as SAEnum
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, JSON, Enum as SAEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -20,9 +20,13 @@ class Document(Base):
     owner_id = Column(String, ForeignKey("users.id"), nullable=False)
     title = Column(String, nullable=False)
     filename = Column(String, nullable=False)
-    file_path = Column(String, nullable=False)
-    signed_file_path = Column(String, nullable=True)
+    file_path = Column(String, nullable=False)  # Storage key, e.g. "{id}/{filename}"
+    signed_file_path = Column(String, nullable=True)  # Storage key
+    optimized_file_path = Column(String, nullable=True)  # Storage key of the linearized/deduplicated copy
+    file_size = Column(Integer, nullable=True)
+    optimized_file_size = Column(Integer, nullable=True)
     page_count = Column(Integer, default=1)
+    page_geometry = Column(JSON, nullable=True)  # Per-page size/rotation/box records, extracted at upload
     status = Column(SAEnum(DocumentStatus), default=DocumentStatus.DRAFT)
     signing_token = Column(String, unique=True, nullable=True)
     signing_token_expires = Column(DateTime(timezone=True), nullable=True)
@@ -34,3 +38,6 @@ class Document(Base):
     owner = relationship("User", back_populates="documents")
     signatures = relationship("Signature", back_populates="document", cascade="all, delete-orphan")
     audit_logs = relationship("AuditLog", back_populates="document", cascade="all, delete-orphan")
+    jobs = relationship("Job", back_populates="document", cascade="all, delete-orphan")
+    campaigns = relationship("Campaign", back_populates="template", cascade="all, delete-orphan")
+    text = relationship("DocumentText", back_populates="document", uselist=False, cascade="all, delete-orphan")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.sql import func
+from database import Base
+
+
+class DocumentEvent(Base):
+    """
+    Status transitions pushed to clients over SSE. Doubles as the cross-worker
+    channel: every API process tails this table by id, and the id is the SSE
+    event id used for Last-Event-ID resume.
+    """
+    __tablename__ = "document_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, nullable=False, index=True)  # Document owner receiving the event
+    document_id = Column(String, nullable=False)  # Not a FK: events outlive deleted documents
+    event_type = Column(String, nullable=False)  # sent, signed, finalized, finalize_failed, expired
+    status = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
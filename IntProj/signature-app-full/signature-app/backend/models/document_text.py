@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, DDL, event
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from database import Base
+
+
+class DocumentText(Base):
+    """
+    Text extracted from a document's PDF once, after upload. The search index
+    is built on this table: an FTS5 table kept in sync by triggers on SQLite,
+    a generated tsvector column with a GIN index on Postgres.
+    """
+    __tablename__ = "document_texts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Stable rowid for the FTS5 index
+    document_id = Column(String, ForeignKey("documents.id"), unique=True, nullable=False)
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    content = Column(Text, nullable=False, default="")
+    extracted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    document = relationship("Document", back_populates="text")
+
+
+# owner_id is an indexed FTS column so owner scoping is part of the MATCH
+# itself rather than a filter over every user's hits
+_SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS document_texts_fts USING fts5(
+        owner_id, title, content, content='document_texts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS document_texts_ai AFTER INSERT ON document_texts BEGIN
+        INSERT INTO document_texts_fts(rowid, owner_id, title, content)
+        VALUES (new.id, new.owner_id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS document_texts_ad AFTER DELETE ON document_texts BEGIN
+        INSERT INTO document_texts_fts(document_texts_fts, rowid, owner_id, title, content)
+        VALUES ('delete', old.id, old.owner_id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS document_texts_au AFTER UPDATE ON document_texts BEGIN
+        INSERT INTO document_texts_fts(document_texts_fts, rowid, owner_id, title, content)
+        VALUES ('delete', old.id, old.owner_id, old.title, old.content);
+        INSERT INTO document_texts_fts(rowid, owner_id, title, content)
+        VALUES (new.id, new.owner_id, new.title, new.content);
+    END""",
+]
+
+_POSTGRES_TSVECTOR = [
+    """ALTER TABLE document_texts ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_document_texts_search_vector ON document_texts USING GIN (search_vector)",
+]
+
+for _statement in _SQLITE_FTS:
+    event.listen(DocumentText.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in _POSTGRES_TSVECTOR:
+    event.listen(DocumentText.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Text, JSON, UniqueConstraint, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+import enum
+from database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (UniqueConstraint("user_id", "idempotency_key"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_type = Column(String, nullable=False)  # finalize | campaign_finalize
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    status = Column(SAEnum(JobStatus), default=JobStatus.QUEUED, index=True)
+    # Held only while the job is queued/running, so one active job per key (e.g. "finalize:{doc_id}")
+    dedupe_key = Column(String, unique=True, nullable=True)
+    idempotency_key = Column(String, nullable=True)  # Client-supplied Idempotency-Key header
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())  # Not claimable before this (back-off)
+    locked_by = Column(String, nullable=True)  # Worker id holding the job
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    document = relationship("Document", back_populates="jobs")
@@ -17,10 +17,11 @@ class Signature(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     document_id = Column(String, ForeignKey("documents.id"), nullable=False)
+    recipient_id = Column(String, ForeignKey("campaign_recipients.id"), nullable=True, index=True)  # Campaign signer
     signer_name = Column(String, nullable=True)
     signer_email = Column(String, nullable=True)
     signature_type = Column(SAEnum(SignatureType), default=SignatureType.DRAWN)
-    signature_data = Column(Text, nullable=True)   # Base64 PNG data
+    signature_data = Column(Text, nullable=True)   # Base64 PNG, or "strokes:..."/"text:..." vector data
     page_number = Column(Integer, nullable=False)
     x_position = Column(Float, nullable=False)     # As percentage of page width
     y_position = Column(Float, nullable=False)     # As percentage of page height
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, ForeignKey, UniqueConstraint, Enum as SAEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+import enum
+from database import Base
+
+
+class UploadSessionStatus(str, enum.Enum):
+    ACTIVE = "active"
+    COMPLETED = "completed"
+
+
+class UploadSession(Base):
+    """A resumable chunked upload; chunks are written straight into a staging file."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    total_chunks = Column(Integer, nullable=False)
+    checksum_sha256 = Column(String, nullable=True)  # Expected hex digest, verified on complete
+    status = Column(SAEnum(UploadSessionStatus), default=UploadSessionStatus.ACTIVE)
+    document_id = Column(String, nullable=True)  # Set once completed
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    chunks = relationship("UploadChunk", back_populates="session", cascade="all, delete-orphan")
+
+
+class UploadChunk(Base):
+    """One row per received chunk, so parallel PUTs never contend on a shared row."""
+    __tablename__ = "upload_chunks"
+    __table_args__ = (UniqueConstraint("upload_id", "chunk_index"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    upload_id = Column(String, ForeignKey("upload_sessions.id"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    session = relationship("UploadSession", back_populates="chunks")
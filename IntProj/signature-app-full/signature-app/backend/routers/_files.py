@@ -0,0 +1,63 @@
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from services.storage_service import get_storage
+from urllib.parse import quote
+
+
+def parse_range(range_header: str, size: int):
+    """Parse a single "bytes=start-end" range; returns (start, end) or None if unsatisfiable."""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start:
+            start, end = int(start), int(end) if end else size - 1
+        else:
+            start, end = size - int(end), size - 1
+    except ValueError:
+        return None
+    start, end = max(start, 0), min(end, size - 1)
+    return (start, end) if start <= end else None
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment header for any filename, quoted the way FileResponse does it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def storage_file_response(request: Request, key: str, filename: str):
+    """Serve a stored PDF from any node, honouring single HTTP Range requests."""
+    storage = get_storage()
+    range_header = request.headers.get("range")
+
+    if range_header:
+        size = storage.size(key)
+        byte_range = parse_range(range_header, size)
+        if not byte_range:
+            raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                                headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        return Response(
+            storage.read_range(key, start, end),
+            status_code=206,
+            media_type="application/pdf",
+            headers={"Content-Range": f"bytes {start}-{end}/{size}", "Accept-Ranges": "bytes"},
+        )
+
+    path = storage.filesystem_path(key)
+    if path:
+        return FileResponse(path, media_type="application/pdf", filename=filename, headers={"Accept-Ranges": "bytes"})
+
+    return StreamingResponse(
+        storage.open_stream(key),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": content_disposition(filename),
+            "Content-Length": str(storage.size(key)),
+            "Accept-Ranges": "bytes",
+        },
+    )
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
-from middleware.auth_middleware import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+from middleware.auth_middleware import get_current_user, get_current_user_read
+from middleware.db_routing import get_read_db, get_read_sessionmaker
 from models.user import User
 from models.document import Document
 from models.audit_log import AuditLog
 from services.audit_service import get_audit_logs
+from services.export_service import build_export_stream, export_headers, export_media_type
 from pydantic import BaseModel
 from datetime import datetime
 from typing import List, Optional
@@ -25,11 +28,50 @@ class AuditLogOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+AUDIT_EXPORT_COLUMNS = [
+    "id", "document_id", "document_title", "event_type", "event_detail",
+    "actor_email", "ip_address", "user_agent", "created_at",
+]
+
+
+@router.get("/export")
+async def export_audit_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    document_id: Optional[str] = None,
+    session_factory: sessionmaker = Depends(get_read_sessionmaker),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream the audit trail across all of the current user's documents.
+    Rows are fetched with a server-side cursor and written as they arrive,
+    so memory use stays flat regardless of export size.
+    """
+    stmt = (
+        select(
+            AuditLog.id, AuditLog.document_id, Document.title, AuditLog.event_type,
+            AuditLog.event_detail, AuditLog.actor_email, AuditLog.ip_address,
+            AuditLog.user_agent, AuditLog.created_at,
+        )
+        .join(Document, Document.id == AuditLog.document_id)
+        .where(Document.owner_id == current_user.id)
+        .order_by(AuditLog.document_id, AuditLog.created_at)
+    )
+    if document_id:
+        stmt = stmt.where(AuditLog.document_id == document_id)
+
+    return StreamingResponse(
+        build_export_stream(stmt, AUDIT_EXPORT_COLUMNS, format, session_factory, compress=gzip),
+        media_type=export_media_type(format, gzip),
+        headers=export_headers("audit_export", format, gzip),
+    )
+
+
 @router.get("/{doc_id}", response_model=List[AuditLogOut])
 async def get_document_audit(
     doc_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
 ):
     """Get the full audit trail for a document."""
     doc = db.query(Document).filter(Document.id == doc_id, Document.owner_id == current_user.id).first()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, mark_recent_write
 from schemas.auth import UserRegister, UserLogin, TokenResponse, UserOut
 from services.auth_service import (
     authenticate_user,
@@ -8,7 +8,7 @@ from services.auth_service import (
     create_access_token,
     get_user_by_email,
 )
-from middleware.auth_middleware import get_current_user
+from middleware.auth_middleware import get_current_user_read
 from models.user import User
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -24,6 +24,7 @@ async def register(payload: UserRegister, db: Session = Depends(get_db)):
             detail="An account with this email already exists"
         )
     user = register_user(db, payload.email, payload.full_name, payload.password)
+    mark_recent_write(user.id)  # The replica may not have the new user yet
     token = create_access_token({"sub": user.id})
     return TokenResponse(access_token=token, user=UserOut.model_validate(user))
 
@@ -42,6 +43,6 @@ async def login(payload: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserOut)
-async def me(current_user: User = Depends(get_current_user)):
+async def me(current_user: User = Depends(get_current_user_read)):
     """Get current authenticated user profile."""
     return current_user
@@ -0,0 +1,188 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from sqlalchemy.orm import Session
+from database import get_db, mark_recent_write
+from middleware.auth_middleware import get_current_user, get_current_user_read
+from middleware.db_routing import get_read_db
+from models.user import User
+from models.document import Document
+from models.campaign import Campaign, CampaignRecipient, RecipientStatus
+from models.job import Job
+from schemas.campaign import CampaignCreate, CampaignOut, CampaignListOut, RecipientOut, RecipientListOut
+from schemas.signature import FinalizeResponse
+from services.campaign_service import CampaignError, campaign_expired, count_by_status, create_campaign, effective_status
+from services.job_service import JOBS_RUN_IN_API, enqueue_job, find_active_job, run_pending_jobs
+from services.storage_service import get_storage
+from routers._files import storage_file_response
+from typing import Optional
+
+router = APIRouter(prefix="/api/campaigns", tags=["Campaigns"])
+
+
+def _get_campaign(db: Session, campaign_id: str, user: User) -> Campaign:
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id, Campaign.owner_id == user.id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+def _campaign_out(campaign: Campaign) -> CampaignOut:
+    """Progress comes straight from the campaign's counters; recipients are never scanned."""
+    return CampaignOut(
+        id=campaign.id,
+        document_id=campaign.document_id,
+        title=campaign.title,
+        recipient_count=campaign.recipient_count,
+        pending_count=count_by_status(campaign, RecipientStatus.PENDING),
+        signed_count=campaign.signed_count,
+        finalized_count=campaign.finalized_count,
+        expired_count=count_by_status(campaign, RecipientStatus.EXPIRED),
+        expires_at=campaign.expires_at,
+        created_at=campaign.created_at,
+        updated_at=campaign.updated_at,
+    )
+
+
+@router.post("", response_model=CampaignOut, status_code=status.HTTP_201_CREATED)
+async def create_signing_campaign(
+    payload: CampaignCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Send one uploaded document to a list of recipients, each with their own signing link."""
+    doc = db.query(Document).filter(Document.id == payload.document_id, Document.owner_id == current_user.id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        campaign = create_campaign(
+            db, current_user, doc,
+            [r.model_dump() for r in payload.recipients],
+            title=payload.title,
+            expires_in_days=payload.expires_in_days,
+            ip_address=request.client.host if request.client else None,
+        )
+    except CampaignError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    mark_recent_write(current_user.id)
+    return _campaign_out(campaign)
+
+
+@router.get("", response_model=CampaignListOut)
+async def list_campaigns(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """List the current user's campaigns with their progress."""
+    campaigns = db.query(Campaign).filter(Campaign.owner_id == current_user.id).order_by(Campaign.created_at.desc()).all()
+    return CampaignListOut(campaigns=[_campaign_out(c) for c in campaigns], total=len(campaigns))
+
+
+@router.get("/{campaign_id}", response_model=CampaignOut)
+async def get_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Aggregate progress (pending / signed / finalized / expired) for one campaign."""
+    return _campaign_out(_get_campaign(db, campaign_id, current_user))
+
+
+@router.get("/{campaign_id}/recipients", response_model=RecipientListOut)
+async def list_recipients(
+    campaign_id: str,
+    request: Request,
+    recipient_status: Optional[RecipientStatus] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Page through recipients, optionally filtered by status."""
+    campaign = _get_campaign(db, campaign_id, current_user)
+    query = db.query(CampaignRecipient).filter(CampaignRecipient.campaign_id == campaign.id)
+    if recipient_status:
+        # Past the deadline, rows still stored as PENDING are reported as EXPIRED
+        stored = [recipient_status]
+        if campaign_expired(campaign) and recipient_status in (RecipientStatus.PENDING, RecipientStatus.EXPIRED):
+            stored = [RecipientStatus.PENDING, RecipientStatus.EXPIRED] if recipient_status == RecipientStatus.EXPIRED else []
+        query = query.filter(CampaignRecipient.status.in_(stored))
+    recipients = query.order_by(CampaignRecipient.id).offset(offset).limit(limit).all()
+
+    items = []
+    for r in recipients:
+        out = RecipientOut.model_validate(r)
+        out.status = effective_status(campaign, r)
+        out.signing_url = f"{request.base_url}sign/{r.signing_token}"
+        items.append(out)
+    return RecipientListOut(recipients=items, total=count_by_status(campaign, recipient_status))
+
+
+@router.post("/{campaign_id}/finalize", response_model=FinalizeResponse, status_code=status.HTTP_202_ACCEPTED)
+async def finalize_signing_campaign(
+    campaign_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queue generating a signed PDF for every recipient who has signed so far.
+    Safe to call repeatedly: already finalized recipients are skipped and
+    only one finalize job per campaign runs at a time.
+    """
+    campaign = _get_campaign(db, campaign_id, current_user)
+
+    def accepted(job: Job, message: str) -> FinalizeResponse:
+        return FinalizeResponse(
+            message=message,
+            document_id=job.document_id,
+            job_id=job.id,
+            status=job.status,
+            status_url=f"{request.base_url}api/jobs/{job.id}",
+        )
+
+    dedupe_key = f"campaign_finalize:{campaign.id}"
+    in_flight = find_active_job(db, dedupe_key)
+    if in_flight:
+        return accepted(in_flight, "Finalize already in progress")
+
+    if not count_by_status(campaign, RecipientStatus.SIGNED):
+        raise HTTPException(status_code=400, detail="No signed recipients waiting to be finalized")
+
+    job, created = enqueue_job(
+        db, "campaign_finalize", document_id=campaign.document_id, user_id=current_user.id,
+        payload={
+            "campaign_id": campaign.id,
+            "actor_email": current_user.email,
+            "ip_address": request.client.host if request.client else None,
+        },
+        dedupe_key=dedupe_key,
+    )
+    if not created:
+        return accepted(job, "Finalize already in progress")
+
+    mark_recent_write(current_user.id)
+    if JOBS_RUN_IN_API:
+        background_tasks.add_task(run_pending_jobs, limit=1)
+
+    return accepted(job, "Finalize queued")
+
+
+@router.get("/{campaign_id}/recipients/{recipient_id}/download")
+async def download_recipient_pdf(
+    campaign_id: str,
+    recipient_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Download one recipient's signed copy once the campaign has been finalized for them."""
+    campaign = _get_campaign(db, campaign_id, current_user)
+    recipient = db.query(CampaignRecipient).filter(
+        CampaignRecipient.id == recipient_id, CampaignRecipient.campaign_id == campaign.id
+    ).first()
+    if not recipient:
+        raise HTTPException(status_code=404, detail="Recipient not found")
+    if not recipient.signed_file_path or not get_storage().exists(recipient.signed_file_path):
+        raise HTTPException(status_code=404, detail="Signed PDF not generated yet")
+    return storage_file_response(request, recipient.signed_file_path, f"signed_{campaign.template.filename}")
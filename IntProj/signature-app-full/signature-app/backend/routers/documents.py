@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Request
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from database import get_db
-from middleware.auth_middleware import get_current_user
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Header, Query, status, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+from database import get_db, mark_recent_write
+from middleware.auth_middleware import get_current_user, get_current_user_read, get_current_user_for_stream
+from middleware.db_routing import get_read_db, get_read_sessionmaker
 from models.user import User
 from models.document import Document, DocumentStatus
-from schemas.document import DocumentOut, DocumentListOut, SendSigningLinkRequest, SendSigningLinkResponse
-from services.pdf_service import save_uploaded_pdf, get_pdf_page_count
+from models.campaign import Campaign, CampaignRecipient
+from schemas.document import (
+    DocumentOut, DocumentListOut, DocumentPagesOut, DocumentSearchOut, SendSigningLinkRequest,
+    SendSigningLinkResponse,
+)
+from schemas.auth import StreamTokenResponse
+from services.pdf_service import extract_page_geometry
+from services.auth_service import STREAM_TOKEN_SECONDS, create_stream_token
+from services.document_service import create_uploaded_document
 from services.audit_service import log_event
-import uuid
+from services.upload_pipeline import run_post_upload_stages
+from services.storage_service import get_storage
+from routers._files import storage_file_response
+from services.event_service import publish_document_event, stream_user_events
+from services.export_service import build_export_stream, export_headers, export_media_type
+from services.search_service import SearchUnavailable, search_documents
 import os
 import secrets
 from datetime import datetime, timedelta
+from typing import Optional
 
 router = APIRouter(prefix="/api/docs", tags=["Documents"])
 
@@ -22,6 +37,7 @@ MAX_SIZE_BYTES = int(os.getenv("MAX_FILE_SIZE_MB", "10")) * 1024 * 1024
 @router.post("/upload", response_model=DocumentOut, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -34,46 +50,106 @@ async def upload_document(
     if len(content) > MAX_SIZE_BYTES:
         raise HTTPException(status_code=413, detail=f"File exceeds {os.getenv('MAX_FILE_SIZE_MB', 10)}MB limit")
 
-    document_id = str(uuid.uuid4())
-    file_path = save_uploaded_pdf(content, file.filename, document_id)
-    page_count = get_pdf_page_count(file_path)
-
-    doc = Document(
-        id=document_id,
-        owner_id=current_user.id,
-        title=file.filename.replace(".pdf", "").replace("_", " ").title(),
-        filename=file.filename,
-        file_path=file_path,
-        page_count=page_count,
-        status=DocumentStatus.DRAFT,
-    )
-    db.add(doc)
-    db.commit()
-    db.refresh(doc)
-
-    log_event(
-        db,
-        document_id=doc.id,
-        event_type="uploaded",
-        user_id=current_user.id,
-        actor_email=current_user.email,
-        event_detail=f"Document '{doc.title}' uploaded ({page_count} pages)",
+    doc = create_uploaded_document(
+        db, current_user, file.filename, content, len(content),
         ip_address=request.client.host if request.client else None,
     )
+    mark_recent_write(current_user.id)
 
+    background_tasks.add_task(run_post_upload_stages, doc.id)
     return doc
 
 
 @router.get("", response_model=DocumentListOut)
 async def list_documents(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
 ):
     """List all documents for the current user."""
     docs = db.query(Document).filter(Document.owner_id == current_user.id).order_by(Document.created_at.desc()).all()
     return DocumentListOut(documents=docs, total=len(docs))
 
 
+@router.get("/search", response_model=DocumentSearchOut)
+async def search_user_documents(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Full-text search over the titles and contents of the current user's documents, best match first."""
+    try:
+        total, hits = search_documents(db, current_user.id, q, limit=limit, offset=offset)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return DocumentSearchOut(query=q, results=hits, total=total, limit=limit, offset=offset)
+
+
+DOCUMENT_EXPORT_COLUMNS = [
+    "id", "title", "filename", "page_count", "status",
+    "signer_email", "created_at", "updated_at",
+]
+
+
+@router.get("/export")
+async def export_documents(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    session_factory: sessionmaker = Depends(get_read_sessionmaker),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream metadata for all of the current user's documents as NDJSON or CSV."""
+    stmt = (
+        select(
+            Document.id, Document.title, Document.filename, Document.page_count,
+            Document.status, Document.signer_email, Document.created_at, Document.updated_at,
+        )
+        .where(Document.owner_id == current_user.id)
+        .order_by(Document.created_at.desc())
+    )
+    return StreamingResponse(
+        build_export_stream(stmt, DOCUMENT_EXPORT_COLUMNS, format, session_factory, compress=gzip),
+        media_type=export_media_type(format, gzip),
+        headers=export_headers("documents_export", format, gzip),
+    )
+
+
+@router.post("/events/token", response_model=StreamTokenResponse)
+async def document_events_token(current_user: User = Depends(get_current_user)):
+    """
+    Issue a short-lived token for opening the event stream. EventSource
+    puts it in the URL, where it can end up in logs, so the long-lived
+    access token never goes there.
+    """
+    return StreamTokenResponse(token=create_stream_token(current_user.id), expires_in=STREAM_TOKEN_SECONDS)
+
+
+@router.get("/events")
+async def document_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    resume_after: Optional[str] = Query(None, alias="last_event_id"),
+    current_user: User = Depends(get_current_user_for_stream),
+):
+    """
+    Server-Sent Events stream of status changes (sent, signed, finalized,
+    expired) for the current user's documents. Reconnecting clients send
+    Last-Event-ID and receive anything they missed; a client opening a new
+    stream with a fresh token passes it as ?last_event_id= instead.
+    """
+    last_event_id = last_event_id or resume_after
+    try:
+        resume_from = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        resume_from = 0
+    return StreamingResponse(
+        stream_user_events(request, current_user.id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{doc_id}", response_model=DocumentOut)
 async def get_document(
     doc_id: str,
@@ -94,25 +170,58 @@ async def get_document(
     return doc
 
 
+@router.get("/{doc_id}/pages", response_model=DocumentPagesOut)
+async def get_document_pages(
+    doc_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get per-page geometry (size, rotation, boxes) without downloading the PDF."""
+    doc = db.query(Document).filter(Document.id == doc_id, Document.owner_id == current_user.id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    if doc.page_geometry is None:
+        # Backfill documents uploaded before geometry was recorded
+        storage = get_storage()
+        if not storage.exists(doc.file_path):
+            raise HTTPException(status_code=404, detail="File not found in storage")
+        with storage.local_path(doc.file_path) as path:
+            doc.page_geometry = extract_page_geometry(path)
+        doc.page_count = len(doc.page_geometry)
+        db.commit()
+
+    pages = [{"page_number": i + 1, **page} for i, page in enumerate(doc.page_geometry)]
+    return DocumentPagesOut(document_id=doc.id, page_count=doc.page_count, pages=pages)
+
+
 @router.get("/{doc_id}/download")
 async def download_document(
     doc_id: str,
+    request: Request,
     signed: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Download the original or signed PDF."""
+    """Download the original or signed PDF, preferring the optimized copy of the original."""
     doc = db.query(Document).filter(Document.id == doc_id, Document.owner_id == current_user.id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if signed and doc.signed_file_path and os.path.exists(doc.signed_file_path):
-        return FileResponse(doc.signed_file_path, media_type="application/pdf", filename=f"signed_{doc.filename}")
+    storage = get_storage()
+    if signed:
+        # Never fall back to the unsigned original when the signed copy was asked for
+        if not doc.signed_file_path or not storage.exists(doc.signed_file_path):
+            raise HTTPException(status_code=409, detail="Signed PDF not generated yet")
+        return storage_file_response(request, doc.signed_file_path, f"signed_{doc.filename}")
+
+    if doc.optimized_file_path and storage.exists(doc.optimized_file_path):
+        return storage_file_response(request, doc.optimized_file_path, doc.filename)
 
-    if not os.path.exists(doc.file_path):
-        raise HTTPException(status_code=404, detail="File not found on disk")
+    if not storage.exists(doc.file_path):
+        raise HTTPException(status_code=404, detail="File not found in storage")
 
-    return FileResponse(doc.file_path, media_type="application/pdf", filename=doc.filename)
+    return storage_file_response(request, doc.file_path, doc.filename)
 
 
 @router.post("/send-link", response_model=SendSigningLinkResponse)
@@ -133,6 +242,8 @@ async def send_signing_link(
     doc.status = DocumentStatus.SENT
     doc.signing_token_expires = datetime.utcnow() + timedelta(days=7)
     db.commit()
+    mark_recent_write(current_user.id)
+    publish_document_event(db, doc, "sent")
 
     signing_url = f"{request.base_url}sign/{token}"
 
@@ -160,5 +271,16 @@ async def delete_document(
     doc = db.query(Document).filter(Document.id == doc_id, Document.owner_id == current_user.id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+
+    stored_keys = [doc.file_path, doc.optimized_file_path, doc.signed_file_path]
+    stored_keys += [
+        key for (key,) in db.query(CampaignRecipient.signed_file_path)
+        .join(Campaign).filter(Campaign.document_id == doc.id, CampaignRecipient.signed_file_path.isnot(None))
+    ]
     db.delete(doc)
     db.commit()
+    mark_recent_write(current_user.id)
+
+    storage = get_storage()
+    for key in filter(None, stored_keys):
+        storage.delete(key)
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from database import get_db, mark_recent_write
+from middleware.auth_middleware import get_current_user
+from models.user import User
+from models.job import Job, JobStatus
+from schemas.job import JobOut
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the status of a background job (e.g. finalize)."""
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == current_user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    out = JobOut.model_validate(job)
+    if job.status == JobStatus.SUCCEEDED:
+        # The worker's writes may not be on the replica yet; keep this user's next reads on the primary
+        mark_recent_write(current_user.id)
+    if job.job_type == "finalize" and job.status == JobStatus.SUCCEEDED:
+        out.download_url = f"{request.base_url}api/docs/{job.document_id}/download?signed=true"
+    return out
@@ -1,19 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from database import get_db
-from middleware.auth_middleware import get_current_user
+from database import get_db, mark_recent_write
+from middleware.auth_middleware import get_current_user, get_current_user_read
+from middleware.db_routing import get_read_db
 from models.user import User
 from models.document import Document, DocumentStatus
 from models.signature import Signature
+from models.job import Job
 from schemas.signature import SignatureCreate, SignatureOut, FinalizeRequest, FinalizeResponse
-from services.pdf_service import embed_signatures_into_pdf, get_signed_pdf_path
+from services.pdf_service import (
+    render_typed_signature_preview, signature_box_size, signature_font_for, validate_signature_placement,
+)
+from services.image_service import normalize_signature_image, InvalidSignatureImage
+from services.vector_service import (
+    TEXT_PREFIX, is_vector_signature, normalize_typed, normalize_vector_signature, InvalidVectorSignature,
+)
 from services.audit_service import log_event
-from typing import List
-import os
+from services.document_service import expire_document
+from services.job_service import (
+    JOBS_RUN_IN_API, IdempotencyConflict, enqueue_job, find_active_job, find_job_by_idempotency_key,
+    run_pending_jobs,
+)
+from services.event_service import publish_document_event
+from services.campaign_service import expire_recipient, find_recipient_by_token, sign_as_recipient
+from models.campaign import CampaignRecipient, RecipientStatus
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/signatures", tags=["Signatures"])
 
 
+def _check_placement(doc: Document, payload: SignatureCreate):
+    """Reject placements outside the document using the stored page geometry."""
+    error = validate_signature_placement(
+        doc.page_geometry, doc.page_count, payload.page_number,
+        payload.x_position, payload.y_position, payload.width, payload.height,
+    )
+    if error:
+        raise HTTPException(status_code=422, detail=error)
+
+
+UNRENDERABLE_TEXT = "Typed signature contains characters the signature font can't render; draw it instead"
+
+# Used to size signature images for documents without stored geometry (US Letter)
+DEFAULT_PAGE_GEOMETRY = {"width": 612.0, "height": 792.0}
+
+
+def _normalize_signature(doc: Document, payload: SignatureCreate) -> str:
+    """
+    Validate vector signatures (strokes/text) as-is; trim and downscale
+    raster images to what their placement box needs.
+    """
+    if is_vector_signature(payload.signature_data):
+        try:
+            data = normalize_vector_signature(payload.signature_data, payload.signature_type)
+        except InvalidVectorSignature as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if data.startswith(TEXT_PREFIX) and not signature_font_for(data[len(TEXT_PREFIX):]):
+            raise HTTPException(status_code=422, detail=UNRENDERABLE_TEXT)
+        return data
+
+    page = DEFAULT_PAGE_GEOMETRY
+    if doc.page_geometry and payload.page_number <= len(doc.page_geometry):
+        page = doc.page_geometry[payload.page_number - 1]
+    box_width, box_height = signature_box_size(page, payload.width, payload.height)
+    try:
+        return normalize_signature_image(payload.signature_data, box_width, box_height)
+    except InvalidSignatureImage as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.post("", response_model=SignatureOut, status_code=201)
 async def create_signature(
     payload: SignatureCreate,
@@ -27,13 +83,15 @@ async def create_signature(
     doc = db.query(Document).filter(Document.id == payload.document_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+    _check_placement(doc, payload)
+    signature_data = _normalize_signature(doc, payload)
 
     sig = Signature(
         document_id=payload.document_id,
         signer_name=payload.signer_name,
         signer_email=payload.signer_email,
         signature_type=payload.signature_type,
-        signature_data=payload.signature_data,
+        signature_data=signature_data,
         page_number=payload.page_number,
         x_position=payload.x_position,
         y_position=payload.y_position,
@@ -44,6 +102,7 @@ async def create_signature(
     db.add(sig)
     db.commit()
     db.refresh(sig)
+    mark_recent_write(doc.owner_id)
 
     log_event(
         db, document_id=doc.id, event_type="signature_placed",
@@ -55,62 +114,149 @@ async def create_signature(
     return sig
 
 
+@router.get("/typed-preview", response_class=Response, responses={200: {"content": {"image/png": {}}}})
+async def typed_signature_preview(text: str):
+    """
+    Render a typed signature with the font and fit used when it's embedded.
+    Public, like signing links, so link signers see the same preview.
+    """
+    try:
+        text = normalize_typed(TEXT_PREFIX + text)[len(TEXT_PREFIX):]
+    except InvalidVectorSignature as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not signature_font_for(text):
+        raise HTTPException(status_code=422, detail=UNRENDERABLE_TEXT)
+    png = await run_in_threadpool(render_typed_signature_preview, text)
+    return Response(png, media_type="image/png", headers={"Cache-Control": "public, max-age=3600"})
+
+
 @router.get("/{doc_id}", response_model=List[SignatureOut])
 async def get_signatures(
     doc_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
 ):
     """Get all signatures for a document."""
     doc = db.query(Document).filter(Document.id == doc_id, Document.owner_id == current_user.id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    return db.query(Signature).filter(Signature.document_id == doc_id).all()
+    return db.query(Signature).filter(Signature.document_id == doc_id, Signature.recipient_id.is_(None)).all()
 
 
-@router.post("/finalize", response_model=FinalizeResponse)
+@router.post("/finalize", response_model=FinalizeResponse, status_code=status.HTTP_202_ACCEPTED)
 async def finalize_document(
     payload: FinalizeRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Embed all signatures into the PDF and lock the document."""
+    """
+    Queue embedding all signatures into the PDF and locking the document.
+    The work is done by a worker process; poll the returned status URL.
+    Concurrent calls for the same document share one job, and retries
+    carrying the same Idempotency-Key header get the original job back.
+    """
+    def accepted(job: Job, message: str) -> FinalizeResponse:
+        return FinalizeResponse(
+            message=message,
+            document_id=job.document_id,
+            job_id=job.id,
+            status=job.status,
+            status_url=f"{request.base_url}api/jobs/{job.id}",
+        )
+
+    if idempotency_key:
+        previous = find_job_by_idempotency_key(db, current_user.id, idempotency_key)
+        if previous:
+            if previous.document_id != payload.document_id:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for another document")
+            return accepted(previous, "Finalize already requested")
+
     doc = db.query(Document).filter(Document.id == payload.document_id, Document.owner_id == current_user.id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    if doc.status == DocumentStatus.SIGNED:
+    dedupe_key = f"finalize:{doc.id}"
+    in_flight = find_active_job(db, dedupe_key)
+    if in_flight:
+        return accepted(in_flight, "Finalize already in progress")
+
+    # Signing via link also sets SIGNED; only a stored signed copy means finalize already ran
+    if doc.status == DocumentStatus.SIGNED and doc.signed_file_path:
         raise HTTPException(status_code=400, detail="Document is already finalized")
 
-    signatures = db.query(Signature).filter(Signature.document_id == doc.id).all()
-    if not signatures:
+    has_signatures = db.query(Signature.id).filter(
+        Signature.document_id == doc.id, Signature.recipient_id.is_(None)
+    ).first()
+    if not has_signatures:
         raise HTTPException(status_code=400, detail="No signatures found to embed")
 
-    output_path = get_signed_pdf_path(doc.id, doc.filename)
-    success = embed_signatures_into_pdf(doc.file_path, output_path, signatures)
+    try:
+        job, created = enqueue_job(
+            db, "finalize", document_id=doc.id, user_id=current_user.id,
+            payload={
+                "actor_email": current_user.email,
+                "ip_address": request.client.host if request.client else None,
+            },
+            dedupe_key=dedupe_key,
+            idempotency_key=idempotency_key,
+        )
+    except IdempotencyConflict as e:
+        # Same check as above, for a request that raced ours with the same key
+        raise HTTPException(status_code=422, detail=str(e))
+    if not created:
+        return accepted(job, "Finalize already in progress")
 
-    if not success:
-        raise HTTPException(status_code=500, detail="PDF generation failed")
+    mark_recent_write(current_user.id)
+    if JOBS_RUN_IN_API:
+        background_tasks.add_task(run_pending_jobs, limit=1)
 
-    doc.signed_file_path = output_path
-    doc.status = DocumentStatus.SIGNED
-    db.commit()
+    return accepted(job, "Finalize queued")
 
-    log_event(
-        db, document_id=doc.id, event_type="finalized",
-        user_id=current_user.id, actor_email=current_user.email,
-        event_detail=f"Document finalized with {len(signatures)} signature(s)",
+
+def _sign_as_campaign_recipient(db: Session, recipient: CampaignRecipient, payload: SignatureCreate, request: Request):
+    """Sign the shared campaign template on behalf of one recipient."""
+    from datetime import datetime
+    campaign = recipient.campaign
+    doc = campaign.template
+
+    if recipient.status == RecipientStatus.EXPIRED or (
+        recipient.status == RecipientStatus.PENDING and campaign.expires_at and campaign.expires_at < datetime.utcnow()
+    ):
+        expire_recipient(db, recipient)
+        raise HTTPException(status_code=410, detail="Signing link has expired")
+
+    payload.document_id = doc.id
+    _check_placement(doc, payload)
+    signature_data = _normalize_signature(doc, payload)
+    sig = Signature(
+        document_id=doc.id,
+        signer_name=payload.signer_name or recipient.name,
+        signer_email=payload.signer_email or recipient.email,
+        signature_type=payload.signature_type,
+        signature_data=signature_data,
+        page_number=payload.page_number,
+        x_position=payload.x_position,
+        y_position=payload.y_position,
+        width=payload.width,
+        height=payload.height,
         ip_address=request.client.host if request.client else None,
     )
+    if not sign_as_recipient(db, recipient, sig):
+        raise HTTPException(status_code=409, detail="This signing link has already been used")
+    mark_recent_write(campaign.owner_id)
 
-    download_url = f"{request.base_url}api/docs/{doc.id}/download?signed=true"
-    return FinalizeResponse(
-        message="Document finalized successfully",
-        document_id=doc.id,
-        download_url=download_url,
+    log_event(
+        db, document_id=doc.id, event_type="signed_via_campaign_link",
+        actor_email=sig.signer_email,
+        event_detail=f"Campaign '{campaign.title}' signed by recipient {recipient.email}",
+        ip_address=request.client.host if request.client else None,
     )
 
+    return {"message": "Document signed successfully", "document_id": doc.id, "campaign_id": campaign.id}
+
 
 @router.post("/sign-with-token")
 async def sign_with_token(
@@ -123,18 +269,24 @@ async def sign_with_token(
     from datetime import datetime
     doc = db.query(Document).filter(Document.signing_token == token).first()
     if not doc:
+        recipient = find_recipient_by_token(db, token)
+        if recipient:
+            return _sign_as_campaign_recipient(db, recipient, payload, request)
         raise HTTPException(status_code=404, detail="Invalid or expired signing link")
 
     if doc.signing_token_expires and doc.signing_token_expires < datetime.utcnow():
+        expire_document(db, doc)  # No-op once signed, so a late click can't un-sign a document
         raise HTTPException(status_code=410, detail="Signing link has expired")
 
     payload.document_id = doc.id
+    _check_placement(doc, payload)
+    signature_data = _normalize_signature(doc, payload)
     sig = Signature(
         document_id=doc.id,
         signer_name=payload.signer_name,
         signer_email=payload.signer_email,
         signature_type=payload.signature_type,
-        signature_data=payload.signature_data,
+        signature_data=signature_data,
         page_number=payload.page_number,
         x_position=payload.x_position,
         y_position=payload.y_position,
@@ -145,6 +297,8 @@ async def sign_with_token(
     db.add(sig)
     doc.status = DocumentStatus.SIGNED
     db.commit()
+    mark_recent_write(doc.owner_id)
+    publish_document_event(db, doc, "signed")
 
     log_event(
         db, document_id=doc.id, event_type="signed_via_link",
@@ -0,0 +1,149 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from database import get_db, mark_recent_write
+from middleware.auth_middleware import get_current_user
+from models.user import User
+from models.document import Document
+from models.upload_session import UploadSession, UploadSessionStatus
+from schemas.document import DocumentOut
+from schemas.upload import UploadSessionCreate, UploadSessionOut
+from services.chunked_upload_service import (
+    ChunkError, UploadTooLarge, claim_for_completion, create_session, discard_staging_file, file_sha256,
+    finish_session, received_chunk_indexes, record_chunk, release_claim, staging_path,
+    summarize_session, write_chunk,
+)
+from services.document_service import create_uploaded_document
+from services.upload_pipeline import run_post_upload_stages
+from datetime import datetime
+from typing import Optional
+import asyncio
+
+router = APIRouter(prefix="/api/uploads", tags=["Uploads"])
+
+
+def _get_session(db: Session, upload_id: str, user: User) -> UploadSession:
+    session = db.query(UploadSession).filter(
+        UploadSession.id == upload_id, UploadSession.owner_id == user.id
+    ).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    if session.status == UploadSessionStatus.ACTIVE and session.expires_at < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="Upload session has expired")
+    return session
+
+
+@router.post("", response_model=UploadSessionOut, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    payload: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Start a resumable upload for a large PDF."""
+    if not payload.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted")
+    try:
+        session = create_session(
+            db, current_user, payload.filename, payload.total_size,
+            chunk_size=payload.chunk_size, checksum_sha256=payload.checksum_sha256,
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ChunkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return summarize_session(db, session)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionOut)
+async def get_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Report received byte ranges and missing chunks so a client can resume."""
+    session = _get_session(db, upload_id, current_user)
+    return summarize_session(db, session)
+
+
+@router.put("/{upload_id}/chunks/{index}", status_code=status.HTTP_204_NO_CONTENT)
+async def put_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Upload one chunk as the raw request body. Chunks may be sent in any
+    order and in parallel; re-sending a chunk overwrites it.
+    """
+    session = _get_session(db, upload_id, current_user)
+    if session.status != UploadSessionStatus.ACTIVE:
+        raise HTTPException(status_code=409, detail="Upload is already completed")
+    try:
+        size = await write_chunk(session, index, request.stream(), checksum_sha256=x_chunk_sha256)
+    except ChunkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    record_chunk(db, session, index, size)
+
+
+@router.post("/{upload_id}/complete", response_model=DocumentOut)
+async def complete_upload_session(
+    upload_id: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Verify the assembled file and create the Document, same as a direct upload."""
+    session = _get_session(db, upload_id, current_user)
+    if session.status == UploadSessionStatus.COMPLETED:
+        doc = db.query(Document).filter(Document.id == session.document_id).first() if session.document_id else None
+        if not doc:
+            raise HTTPException(status_code=409, detail="Upload is being completed")
+        return doc
+
+    missing = session.total_chunks - len(received_chunk_indexes(db, session))
+    if missing:
+        raise HTTPException(status_code=409, detail=f"{missing} chunk(s) still missing")
+
+    if not claim_for_completion(db, session):
+        raise HTTPException(status_code=409, detail="Upload is being completed")
+
+    path = staging_path(session.id)
+    try:
+        if session.checksum_sha256:
+            digest = await asyncio.to_thread(file_sha256, path)
+            if digest != session.checksum_sha256:
+                raise HTTPException(status_code=422, detail="Checksum mismatch — re-send the chunks and retry")
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                raise HTTPException(status_code=400, detail="Only PDF files are accepted")
+
+        doc = create_uploaded_document(
+            db, current_user, session.filename, path, session.total_size,
+            ip_address=request.client.host if request.client else None,
+        )
+    except Exception:
+        release_claim(db, session)
+        raise
+
+    finish_session(db, session, doc.id)
+    mark_recent_write(current_user.id)
+    background_tasks.add_task(run_post_upload_stages, doc.id)
+    return doc
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Abandon an upload and free its staging space."""
+    session = _get_session(db, upload_id, current_user)
+    if session.status == UploadSessionStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Upload is already completed")
+    discard_staging_file(session.id)
+    db.delete(session)
+    db.commit()
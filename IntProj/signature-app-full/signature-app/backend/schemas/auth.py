@@ -38,5 +38,10 @@ class TokenResponse(BaseModel):
     user: UserOut
 
 
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     user_id: Optional[str] = None
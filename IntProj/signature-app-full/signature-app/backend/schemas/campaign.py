@@ -0,0 +1,53 @@
+from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+from typing import Optional, List
+from models.campaign import RecipientStatus
+
+
+class RecipientIn(BaseModel):
+    email: EmailStr
+    name: Optional[str] = None
+
+
+class CampaignCreate(BaseModel):
+    document_id: str
+    title: Optional[str] = None
+    recipients: List[RecipientIn]
+    expires_in_days: int = Field(7, ge=1, le=90)
+
+
+class CampaignOut(BaseModel):
+    id: str
+    document_id: str
+    title: str
+    recipient_count: int
+    pending_count: int
+    signed_count: int
+    finalized_count: int
+    expired_count: int
+    expires_at: Optional[datetime]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class CampaignListOut(BaseModel):
+    campaigns: List[CampaignOut]
+    total: int
+
+
+class RecipientOut(BaseModel):
+    id: str
+    email: str
+    name: Optional[str]
+    status: RecipientStatus
+    signing_token: str
+    signing_url: Optional[str] = None
+    signed_at: Optional[datetime]
+    finalized_at: Optional[datetime]
+
+    model_config = {"from_attributes": True}
+
+
+class RecipientListOut(BaseModel):
+    recipients: List[RecipientOut]
+    total: int
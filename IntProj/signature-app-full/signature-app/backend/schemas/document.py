@@ -18,11 +18,42 @@ class DocumentOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class PageGeometryOut(BaseModel):
+    page_number: int
+    width: float
+    height: float
+    rotation: int
+    mediabox: List[float]
+    cropbox_offset: List[float]
+    has_text: bool
+
+
+class DocumentPagesOut(BaseModel):
+    document_id: str
+    page_count: int
+    pages: List[PageGeometryOut]
+
+
 class DocumentListOut(BaseModel):
     documents: List[DocumentOut]
     total: int
 
 
+class DocumentSearchHit(BaseModel):
+    document: DocumentOut
+    score: float
+    title_highlight: str  # HTML-escaped, matches wrapped in <mark>
+    snippet: str
+
+
+class DocumentSearchOut(BaseModel):
+    query: str
+    results: List[DocumentSearchHit]
+    total: int
+    limit: int
+    offset: int
+
+
 class SendSigningLinkRequest(BaseModel):
     document_id: str
     signer_email: EmailStr
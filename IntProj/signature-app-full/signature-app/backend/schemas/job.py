@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from models.job import JobStatus
+
+
+class JobOut(BaseModel):
+    id: str
+    job_type: str
+    document_id: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str]
+    result: Optional[dict]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    download_url: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
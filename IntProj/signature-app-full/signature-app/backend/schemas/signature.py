@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
 from models.signature import SignatureType
+from models.job import JobStatus
 
 
 class SignatureCreate(BaseModel):
@@ -9,7 +10,7 @@ class SignatureCreate(BaseModel):
     signer_name: Optional[str] = None
     signer_email: Optional[str] = None
     signature_type: SignatureType = SignatureType.DRAWN
-    signature_data: str   # Base64 PNG
+    signature_data: str   # Base64 PNG, or vector: "strokes:..." (drawn) / "text:..." (typed)
     page_number: int
     x_position: float
     y_position: float
@@ -40,4 +41,6 @@ class FinalizeRequest(BaseModel):
 class FinalizeResponse(BaseModel):
     message: str
     document_id: str
-    download_url: str
+    job_id: str
+    status: JobStatus
+    status_url: str
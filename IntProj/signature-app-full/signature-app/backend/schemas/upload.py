@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+from models.upload_session import UploadSessionStatus
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int = Field(gt=0)
+    chunk_size: Optional[int] = None  # Defaults to UPLOAD_CHUNK_SIZE_MB
+    # Optional SHA-256 (hex) of the whole file; verified on complete when given
+    checksum_sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")
+
+
+class UploadSessionOut(BaseModel):
+    upload_id: str
+    filename: str
+    status: UploadSessionStatus
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    received_bytes: int
+    received_ranges: List[List[int]]  # Inclusive [start, end] byte ranges
+    missing_chunks: List[int]
+    document_id: Optional[str] = None
+    expires_at: datetime
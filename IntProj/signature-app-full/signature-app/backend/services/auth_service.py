@@ -10,6 +10,11 @@ import os
 SECRET_KEY = os.getenv("SECRET_KEY", "changeme-use-a-real-secret-in-production-32chars!")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+STREAM_TOKEN_SECONDS = int(os.getenv("STREAM_TOKEN_SECONDS", "60"))
+
+# Event stream tokens travel in a URL, so they get their own key: they are
+# never accepted as bearer tokens, and access tokens never open a stream
+STREAM_TOKEN_KEY = f"{SECRET_KEY}:events"
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -29,9 +34,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def decode_token(token: str) -> Optional[TokenData]:
+def create_stream_token(user_id: str) -> str:
+    """Short-lived token that only opens the /api/docs/events stream."""
+    expire = datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_SECONDS)
+    return jwt.encode({"sub": user_id, "exp": expire}, STREAM_TOKEN_KEY, algorithm=ALGORITHM)
+
+
+def decode_token(token: str, key: str = SECRET_KEY) -> Optional[TokenData]:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, key, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
@@ -40,6 +51,10 @@ def decode_token(token: str) -> Optional[TokenData]:
         return None
 
 
+def decode_stream_token(token: str) -> Optional[TokenData]:
+    return decode_token(token, STREAM_TOKEN_KEY)
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
@@ -0,0 +1,240 @@
+import os
+import secrets
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from models.campaign import Campaign, CampaignRecipient, RecipientStatus
+from models.document import Document, DocumentStatus
+from models.signature import Signature
+from models.user import User
+from services.audit_service import log_event
+from services.pdf_service import embed_signatures_into_pdf, get_campaign_signed_pdf_key
+from services.storage_service import get_storage
+
+
+MAX_CAMPAIGN_RECIPIENTS = int(os.getenv("MAX_CAMPAIGN_RECIPIENTS", "10000"))
+RECIPIENT_INSERT_BATCH = 1000
+FINALIZE_BATCH_SIZE = int(os.getenv("CAMPAIGN_FINALIZE_BATCH_SIZE", "100"))
+
+
+class CampaignError(Exception):
+    """The campaign request is invalid or can never succeed."""
+
+
+def create_campaign(
+    db: Session,
+    owner: User,
+    doc: Document,
+    recipients: List[dict],
+    title: Optional[str] = None,
+    expires_in_days: int = 7,
+    ip_address: Optional[str] = None,
+) -> Campaign:
+    """
+    Send one uploaded template to many recipients. Every recipient shares the
+    template's stored file (nothing is copied); recipient rows are inserted in
+    bulk and the whole campaign is one commit and one audit entry.
+    """
+    if doc.status == DocumentStatus.SIGNED:
+        raise CampaignError("A finalized document cannot be used as a campaign template")
+
+    # One signing record per address, first spelling wins
+    unique, seen = [], set()
+    for r in recipients:
+        email = r["email"].strip()
+        if email.lower() not in seen:
+            seen.add(email.lower())
+            unique.append({"email": email, "name": r.get("name")})
+    if not unique:
+        raise CampaignError("A campaign needs at least one recipient")
+    if len(unique) > MAX_CAMPAIGN_RECIPIENTS:
+        raise CampaignError(f"A campaign can have at most {MAX_CAMPAIGN_RECIPIENTS} recipients")
+
+    campaign = Campaign(
+        owner_id=owner.id,
+        document_id=doc.id,
+        title=title or doc.title,
+        recipient_count=len(unique),
+        signed_count=0,
+        finalized_count=0,
+        expired_count=0,
+        expires_at=datetime.utcnow() + timedelta(days=expires_in_days),
+    )
+    db.add(campaign)
+    db.flush()
+
+    for start in range(0, len(unique), RECIPIENT_INSERT_BATCH):
+        batch = [
+            {
+                "campaign_id": campaign.id,
+                "email": r["email"],
+                "name": r["name"],
+                "signing_token": secrets.token_urlsafe(32),
+                "status": RecipientStatus.PENDING,
+            }
+            for r in unique[start:start + RECIPIENT_INSERT_BATCH]
+        ]
+        db.execute(insert(CampaignRecipient), batch)
+    db.commit()
+    db.refresh(campaign)
+
+    log_event(
+        db, document_id=doc.id, event_type="campaign_created",
+        user_id=owner.id, actor_email=owner.email,
+        event_detail=f"Campaign '{campaign.title}' sent to {len(unique)} recipient(s)",
+        ip_address=ip_address,
+    )
+    return campaign
+
+
+def campaign_expired(campaign: Campaign) -> bool:
+    return bool(campaign.expires_at and campaign.expires_at < datetime.utcnow())
+
+
+def effective_status(campaign: Campaign, recipient: CampaignRecipient) -> RecipientStatus:
+    """
+    A recipient's status as reported to the owner. Pending rows are only
+    switched to EXPIRED when their link is used, so once the campaign's
+    deadline has passed every pending recipient is reported as expired.
+    """
+    if recipient.status == RecipientStatus.PENDING and campaign_expired(campaign):
+        return RecipientStatus.EXPIRED
+    return recipient.status
+
+
+def count_by_status(campaign: Campaign, status: Optional[RecipientStatus] = None) -> int:
+    """Number of recipients in a status (as effective_status reports it), from the campaign counters (no row scan)."""
+    if status is None:
+        return campaign.recipient_count
+    unsigned = campaign.recipient_count - campaign.signed_count
+    expired = unsigned if campaign_expired(campaign) else campaign.expired_count
+    return {
+        RecipientStatus.PENDING: unsigned - expired,
+        RecipientStatus.SIGNED: campaign.signed_count - campaign.finalized_count,
+        RecipientStatus.FINALIZED: campaign.finalized_count,
+        RecipientStatus.EXPIRED: expired,
+    }[status]
+
+
+def find_recipient_by_token(db: Session, token: str) -> Optional[CampaignRecipient]:
+    return db.query(CampaignRecipient).filter(CampaignRecipient.signing_token == token).first()
+
+
+def _bump_counter(db: Session, campaign_id: str, column, amount: int = 1):
+    """Increment a progress counter in SQL so concurrent signers don't lose updates."""
+    db.query(Campaign).filter(Campaign.id == campaign_id).update(
+        {column: column + amount}, synchronize_session=False
+    )
+
+
+def expire_recipient(db: Session, recipient: CampaignRecipient):
+    """Mark a pending recipient whose campaign has expired; counted once."""
+    updated = db.query(CampaignRecipient).filter(
+        CampaignRecipient.id == recipient.id,
+        CampaignRecipient.status == RecipientStatus.PENDING,
+    ).update({CampaignRecipient.status: RecipientStatus.EXPIRED}, synchronize_session=False)
+    if updated:
+        _bump_counter(db, recipient.campaign_id, Campaign.expired_count)
+    db.commit()
+
+
+def sign_as_recipient(db: Session, recipient: CampaignRecipient, signature: Signature) -> bool:
+    """
+    Record a recipient's signature against the shared template. Returns False
+    if the recipient already signed (the PENDING -> SIGNED switch is a
+    conditional update, so double submits only count once).
+    """
+    updated = db.query(CampaignRecipient).filter(
+        CampaignRecipient.id == recipient.id,
+        CampaignRecipient.status == RecipientStatus.PENDING,
+    ).update(
+        {CampaignRecipient.status: RecipientStatus.SIGNED, CampaignRecipient.signed_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    if not updated:
+        db.rollback()
+        return False
+
+    signature.recipient_id = recipient.id
+    db.add(signature)
+    _bump_counter(db, recipient.campaign_id, Campaign.signed_count)
+    db.commit()
+    return True
+
+
+def finalize_campaign(
+    db: Session,
+    campaign_id: str,
+    user_id: Optional[str] = None,
+    actor_email: Optional[str] = None,
+    ip_address: Optional[str] = None,
+) -> dict:
+    """
+    Produce a signed PDF for every recipient who has signed but not yet been
+    finalized. The template is fetched from storage once; recipients are
+    processed and committed in batches, so a retried job resumes where the
+    previous attempt stopped. Raises CampaignError for permanent failures.
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise CampaignError("Campaign not found")
+    doc = campaign.template
+
+    storage = get_storage()
+    finalized = 0
+    with storage.local_path(doc.file_path) as source_path, tempfile.TemporaryDirectory() as tmp_dir:
+        while True:
+            batch = (
+                db.query(CampaignRecipient)
+                .filter(
+                    CampaignRecipient.campaign_id == campaign.id,
+                    CampaignRecipient.status == RecipientStatus.SIGNED,
+                )
+                .order_by(CampaignRecipient.id)
+                .limit(FINALIZE_BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+
+            signatures = {}
+            for sig in db.query(Signature).filter(Signature.recipient_id.in_([r.id for r in batch])):
+                signatures.setdefault(sig.recipient_id, []).append(sig)
+
+            done = []
+            for recipient in batch:
+                key = get_campaign_signed_pdf_key(doc.id, campaign.id, recipient.id, doc.filename)
+                output_path = os.path.join(tmp_dir, f"{recipient.id}.pdf")
+                if not embed_signatures_into_pdf(source_path, output_path, signatures.get(recipient.id, []), doc.page_geometry):
+                    raise RuntimeError(f"PDF generation failed for recipient {recipient.id}")
+                storage.put_file(key, output_path)
+                os.remove(output_path)
+                done.append((recipient.id, key))
+
+            now = datetime.utcnow()
+            count = 0
+            for recipient_id, key in done:
+                count += db.query(CampaignRecipient).filter(
+                    CampaignRecipient.id == recipient_id,
+                    CampaignRecipient.status == RecipientStatus.SIGNED,
+                ).update(
+                    {
+                        CampaignRecipient.status: RecipientStatus.FINALIZED,
+                        CampaignRecipient.signed_file_path: key,
+                        CampaignRecipient.finalized_at: now,
+                    },
+                    synchronize_session=False,
+                )
+            _bump_counter(db, campaign.id, Campaign.finalized_count, count)
+            db.commit()
+            finalized += count
+
+    log_event(
+        db, document_id=doc.id, event_type="campaign_finalized",
+        user_id=user_id, actor_email=actor_email,
+        event_detail=f"Campaign '{campaign.title}': {finalized} signed PDF(s) generated",
+        ip_address=ip_address,
+    )
+    return {"campaign_id": campaign.id, "finalized": finalized}
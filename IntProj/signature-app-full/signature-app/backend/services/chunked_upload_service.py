@@ -0,0 +1,223 @@
+import hashlib
+import math
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from models.upload_session import UploadSession, UploadSessionStatus, UploadChunk
+from models.user import User
+from services.storage_service import UPLOAD_DIR
+
+
+# Chunks of one session must reach the same staging directory: use a shared
+# volume (or sticky routing) when running several API nodes
+UPLOAD_STAGING_DIR = os.getenv("UPLOAD_STAGING_DIR", os.path.join(UPLOAD_DIR, ".staging"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE_MB", "8")) * 1024 * 1024
+MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE_MB", "64")) * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNKED_UPLOAD_SIZE = int(os.getenv("MAX_CHUNKED_UPLOAD_MB", "500")) * 1024 * 1024
+UPLOAD_SESSION_HOURS = int(os.getenv("UPLOAD_SESSION_HOURS", "24"))
+
+
+class ChunkError(ValueError):
+    pass
+
+
+class UploadTooLarge(ChunkError):
+    pass
+
+
+def staging_path(upload_id: str) -> str:
+    return os.path.join(UPLOAD_STAGING_DIR, f"{upload_id}.part")
+
+
+def create_session(
+    db: Session,
+    owner: User,
+    filename: str,
+    total_size: int,
+    chunk_size: Optional[int] = None,
+    checksum_sha256: Optional[str] = None,
+) -> UploadSession:
+    """
+    Register an upload and preallocate its (sparse) staging file.
+    `checksum_sha256` of the whole file is optional: when given, completing
+    the upload verifies it; when omitted, only chunk sizes are checked.
+    """
+    if total_size > MAX_CHUNKED_UPLOAD_SIZE:
+        raise UploadTooLarge(f"File exceeds {MAX_CHUNKED_UPLOAD_SIZE // (1024 * 1024)}MB limit")
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise ChunkError(f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+
+    purge_expired_sessions(db)
+
+    session = UploadSession(
+        owner_id=owner.id,
+        filename=os.path.basename(filename),
+        total_size=total_size,
+        chunk_size=chunk_size,
+        total_chunks=math.ceil(total_size / chunk_size),
+        checksum_sha256=checksum_sha256.lower() if checksum_sha256 else None,
+        status=UploadSessionStatus.ACTIVE,
+        expires_at=datetime.utcnow() + timedelta(hours=UPLOAD_SESSION_HOURS),
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+
+    os.makedirs(UPLOAD_STAGING_DIR, exist_ok=True)
+    with open(staging_path(session.id), "wb") as f:
+        f.truncate(total_size)
+    return session
+
+
+def expected_chunk_size(session: UploadSession, index: int) -> int:
+    if index < 0 or index >= session.total_chunks:
+        raise ChunkError(f"Chunk index must be between 0 and {session.total_chunks - 1}")
+    return min(session.chunk_size, session.total_size - index * session.chunk_size)
+
+
+async def write_chunk(
+    session: UploadSession,
+    index: int,
+    body: AsyncIterator[bytes],
+    checksum_sha256: Optional[str] = None,
+) -> int:
+    """
+    Stream a chunk's request body straight to its offset in the staging file.
+    Chunks may arrive in any order or in parallel since each owns its byte range.
+    Writes run in the threadpool so a slow disk doesn't stall the event loop.
+    `checksum_sha256` (the X-Chunk-Sha256 header) is optional; when given,
+    the chunk is rejected unless it matches.
+    """
+    expected = expected_chunk_size(session, index)
+    offset = index * session.chunk_size
+    digest = hashlib.sha256()
+    written = 0
+
+    fd = os.open(staging_path(session.id), os.O_WRONLY)
+    try:
+        async for data in body:
+            if written + len(data) > expected:
+                raise ChunkError(f"Chunk {index} exceeds its expected size of {expected} bytes")
+            await run_in_threadpool(os.pwrite, fd, data, offset + written)
+            digest.update(data)
+            written += len(data)
+    finally:
+        os.close(fd)
+
+    if written != expected:
+        raise ChunkError(f"Chunk {index} is {written} bytes, expected {expected}")
+    if checksum_sha256 and digest.hexdigest() != checksum_sha256.lower():
+        raise ChunkError(f"Chunk {index} checksum mismatch")
+    return written
+
+
+def record_chunk(db: Session, session: UploadSession, index: int, size: int):
+    """Mark a chunk received; re-sent chunks are simply overwritten on disk."""
+    db.add(UploadChunk(upload_id=session.id, chunk_index=index, size=size))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def received_chunk_indexes(db: Session, session: UploadSession) -> List[int]:
+    rows = (
+        db.query(UploadChunk.chunk_index)
+        .filter(UploadChunk.upload_id == session.id)
+        .order_by(UploadChunk.chunk_index)
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def summarize_session(db: Session, session: UploadSession) -> dict:
+    """Received byte ranges (merged) and missing chunk indexes, for resuming."""
+    if session.status == UploadSessionStatus.COMPLETED:
+        indexes = list(range(session.total_chunks))
+    else:
+        indexes = received_chunk_indexes(db, session)
+
+    ranges, received_bytes = [], 0
+    for index in indexes:
+        start = index * session.chunk_size
+        end = start + expected_chunk_size(session, index) - 1
+        received_bytes += end - start + 1
+        if ranges and ranges[-1][1] == start - 1:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    received = set(indexes)
+    return {
+        "upload_id": session.id,
+        "filename": session.filename,
+        "status": session.status,
+        "total_size": session.total_size,
+        "chunk_size": session.chunk_size,
+        "total_chunks": session.total_chunks,
+        "received_bytes": received_bytes,
+        "received_ranges": ranges,
+        "missing_chunks": [i for i in range(session.total_chunks) if i not in received],
+        "document_id": session.document_id,
+        "expires_at": session.expires_at,
+    }
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1024 * 1024):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def claim_for_completion(db: Session, session: UploadSession) -> bool:
+    """Atomically flip ACTIVE -> COMPLETED so concurrent completes create one document."""
+    claimed = (
+        db.query(UploadSession)
+        .filter(UploadSession.id == session.id, UploadSession.status == UploadSessionStatus.ACTIVE)
+        .update({UploadSession.status: UploadSessionStatus.COMPLETED}, synchronize_session=False)
+    )
+    db.commit()
+    db.refresh(session)
+    return bool(claimed)
+
+
+def release_claim(db: Session, session: UploadSession):
+    session.status = UploadSessionStatus.ACTIVE
+    db.commit()
+
+
+def finish_session(db: Session, session: UploadSession, document_id: str):
+    """Link the created document and drop the staging file and chunk bookkeeping."""
+    session.document_id = document_id
+    db.query(UploadChunk).filter(UploadChunk.upload_id == session.id).delete(synchronize_session=False)
+    db.commit()
+    discard_staging_file(session.id)
+
+
+def discard_staging_file(upload_id: str):
+    try:
+        os.remove(staging_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired_sessions(db: Session):
+    """Drop unfinished sessions past their expiry along with their staging files."""
+    expired = (
+        db.query(UploadSession)
+        .filter(UploadSession.status == UploadSessionStatus.ACTIVE, UploadSession.expires_at < datetime.utcnow())
+        .limit(100)
+        .all()
+    )
+    for session in expired:
+        discard_staging_file(session.id)
+        db.delete(session)
+    if expired:
+        db.commit()
@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime
+from typing import Optional, Union
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.document import Document, DocumentStatus
+from models.user import User
+from services.audit_service import log_event
+from services.event_service import publish_document_event
+from services.pdf_service import save_uploaded_pdf, get_pdf_page_count, extract_page_geometry
+
+
+def create_uploaded_document(
+    db: Session,
+    owner: User,
+    filename: str,
+    source: Union[str, bytes],
+    file_size: int,
+    ip_address: Optional[str] = None,
+) -> Document:
+    """
+    Store an uploaded PDF and create its Document row. `source` is either the
+    file's bytes (single-request upload) or a local path (assembled chunked
+    upload), so large files are never read into memory here.
+    """
+    document_id = str(uuid.uuid4())
+    file_path = save_uploaded_pdf(source, filename, document_id)
+    try:
+        page_geometry = extract_page_geometry(source)
+        page_count = len(page_geometry)
+    except Exception:
+        page_geometry = None
+        page_count = get_pdf_page_count(source)
+
+    doc = Document(
+        id=document_id,
+        owner_id=owner.id,
+        title=filename.replace(".pdf", "").replace("_", " ").title(),
+        filename=filename,
+        file_path=file_path,
+        file_size=file_size,
+        page_count=page_count,
+        page_geometry=page_geometry,
+        status=DocumentStatus.DRAFT,
+    )
+    db.add(doc)
+    db.commit()
+    db.refresh(doc)
+
+    log_event(
+        db,
+        document_id=doc.id,
+        event_type="uploaded",
+        user_id=owner.id,
+        actor_email=owner.email,
+        event_detail=f"Document '{doc.title}' uploaded ({page_count} pages)",
+        ip_address=ip_address,
+    )
+    return doc
+
+
+# Only documents still waiting on a signer can expire; SIGNED is final
+EXPIRABLE_STATUSES = (DocumentStatus.DRAFT, DocumentStatus.SENT)
+
+
+def expire_document(db: Session, doc: Document) -> bool:
+    """
+    Move a document whose signing link has lapsed to EXPIRED and announce it.
+    The switch is a conditional update, so concurrent callers (the signing
+    route and the worker's sweep) publish the event only once.
+    """
+    updated = db.query(Document).filter(
+        Document.id == doc.id,
+        Document.status.in_(EXPIRABLE_STATUSES),
+    ).update({Document.status: DocumentStatus.EXPIRED}, synchronize_session=False)
+    db.commit()
+    if not updated:
+        return False
+    db.refresh(doc)
+    publish_document_event(db, doc, "expired")
+    return True
+
+
+def expire_overdue_documents(batch_size: int = 500) -> int:
+    """Expire every DRAFT/SENT document whose signing link has passed its deadline. Returns how many."""
+    db = SessionLocal()
+    expired = 0
+    try:
+        while True:
+            docs = (
+                db.query(Document)
+                .filter(
+                    Document.status.in_(EXPIRABLE_STATUSES),
+                    Document.signing_token_expires < datetime.utcnow(),
+                )
+                .limit(batch_size)
+                .all()
+            )
+            expired_now = sum(expire_document(db, doc) for doc in docs)
+            expired += expired_now
+            if len(docs) < batch_size or not expired_now:
+                break
+    finally:
+        db.close()
+    return expired
@@ -0,0 +1,319 @@
+import asyncio
+import itertools
+from abc import ABC, abstractmethod
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.document import Document
+from models.document_event import DocumentEvent
+
+
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "database")  # database | local
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "1"))
+EVENTS_RETENTION_HOURS = int(os.getenv("EVENTS_RETENTION_HOURS", "24"))
+EVENTS_REPLAY_LIMIT = int(os.getenv("EVENTS_REPLAY_LIMIT", "500"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# How long an id skipped by the tail is re-checked in case its transaction commits late
+EVENTS_GAP_SECONDS = float(os.getenv("EVENTS_GAP_SECONDS", "30"))
+EVENTS_MAX_GAPS = 1000
+
+
+class EventBroadcaster:
+    """In-process fan-out of events to the SSE streams connected to this worker."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1000)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(user_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    def dispatch(self, event: dict):
+        """Deliver an event to the owner's streams. Must run on the event loop."""
+        for queue in self.subscribers.get(event["user_id"], ()):
+            if not queue.full():  # A stalled client catches up via Last-Event-ID on reconnect
+                queue.put_nowait(event)
+
+    def dispatch_threadsafe(self, event: dict):
+        """Deliver an event from any thread (sync route handlers, background tasks)."""
+        if not self.loop or self.loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.dispatch(event)
+        else:
+            self.loop.call_soon_threadsafe(self.dispatch, event)
+
+
+broadcaster = EventBroadcaster()
+
+
+def _to_dict(row: DocumentEvent) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "document_id": row.document_id,
+        "event_type": row.event_type,
+        "status": row.status,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+class EventChannel(ABC):
+    """Carries events between API workers; each worker feeds its own broadcaster."""
+
+    @abstractmethod
+    def publish(self, db: Session, user_id: str, document_id: str, event_type: str, status: Optional[str]):
+        ...
+
+    @abstractmethod
+    def replay(self, user_id: str, after_id: int) -> List[dict]:
+        """Events for a user newer than after_id, for Last-Event-ID resume."""
+
+    def can_replay(self, after_id: int) -> bool:
+        """Whether replay() can return everything after after_id."""
+        return True
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class LocalChannel(EventChannel):
+    """
+    Single-process stand-in for development and tests: events never leave
+    this process and replay comes from a bounded in-memory buffer, so it
+    doesn't work with multiple API workers or separate job workers.
+    Ids start at the process start time in microseconds, so they keep
+    increasing across restarts and an id from an earlier run is never
+    mistaken for a newer event.
+    """
+
+    def __init__(self, buffer_size: int = EVENTS_REPLAY_LIMIT * 10):
+        self.first_id = time.time_ns() // 1000
+        self.ids = itertools.count(self.first_id)
+        self.last_id = self.first_id - 1
+        self.buffer = deque(maxlen=buffer_size)
+        self.lock = threading.Lock()
+
+    def publish(self, db, user_id, document_id, event_type, status):
+        with self.lock:
+            self.last_id = next(self.ids)
+            event = {
+                "id": self.last_id,
+                "user_id": user_id,
+                "document_id": document_id,
+                "event_type": event_type,
+                "status": status,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            self.buffer.append(event)
+        broadcaster.dispatch_threadsafe(event)
+
+    def replay(self, user_id, after_id):
+        return [e for e in self.buffer if e["user_id"] == user_id and e["id"] > after_id][-EVENTS_REPLAY_LIMIT:]
+
+    def can_replay(self, after_id):
+        # Ids from an earlier run, another process, or evicted from the buffer are lost
+        oldest = self.buffer[0]["id"] if self.buffer else self.first_id
+        return oldest - 1 <= after_id <= self.last_id
+
+
+class DatabaseChannel(EventChannel):
+    """
+    Cross-worker channel backed by the document_events table. Publishers
+    (API nodes and job workers alike) insert a row; each API process runs one
+    poller that tails the table by id and hands new rows to its broadcaster,
+    so the database sees one query per process per interval, not per client.
+
+    Ids are handed out at insert but become visible at commit, so a slow
+    transaction can commit an id below one already seen. Ids the tail jumped
+    over are kept as gaps and re-queried until they show up or
+    EVENTS_GAP_SECONDS passes (rolled-back inserts never do).
+    """
+
+    def __init__(self):
+        self.last_id = 0
+        self.gaps: Dict[int, float] = {}  # Skipped id -> monotonic time it was first missed
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, db, user_id, document_id, event_type, status):
+        db.add(DocumentEvent(user_id=user_id, document_id=document_id, event_type=event_type, status=status))
+        db.commit()
+
+    def replay(self, user_id, after_id):
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(DocumentEvent)
+                .filter(DocumentEvent.user_id == user_id, DocumentEvent.id > after_id)
+                .order_by(DocumentEvent.id)
+                .limit(EVENTS_REPLAY_LIMIT)
+                .all()
+            )
+            return [_to_dict(row) for row in rows]
+        finally:
+            db.close()
+
+    def _fetch_new(self, last_id: int, gap_ids: List[int]) -> List[dict]:
+        db = SessionLocal()
+        try:
+            condition = DocumentEvent.id > last_id
+            if gap_ids:
+                condition = or_(condition, DocumentEvent.id.in_(gap_ids))
+            rows = (
+                db.query(DocumentEvent)
+                .filter(condition)
+                .order_by(DocumentEvent.id)
+                .limit(1000)
+                .all()
+            )
+            return [_to_dict(row) for row in rows]
+        finally:
+            db.close()
+
+    def _latest_id(self) -> int:
+        db = SessionLocal()
+        try:
+            row = db.query(DocumentEvent.id).order_by(DocumentEvent.id.desc()).first()
+            return row[0] if row else 0
+        finally:
+            db.close()
+
+    def _prune(self):
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(hours=EVENTS_RETENTION_HOURS)
+            db.query(DocumentEvent).filter(DocumentEvent.created_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _accept(self, event_id: int, now: float) -> bool:
+        """Advance the tail past event_id, recording any ids it skips. False if already delivered."""
+        if event_id in self.gaps:
+            del self.gaps[event_id]
+            return True
+        if event_id <= self.last_id:
+            return False
+        for missing in range(max(self.last_id + 1, event_id - EVENTS_MAX_GAPS), event_id):
+            self.gaps[missing] = now
+        self.last_id = event_id
+        return True
+
+    async def _poll(self):
+        polls = 0
+        while True:
+            try:
+                events = await asyncio.to_thread(self._fetch_new, self.last_id, list(self.gaps))
+                now = time.monotonic()
+                for event in events:
+                    if self._accept(event["id"], now):
+                        broadcaster.dispatch(event)
+                self.gaps = {i: t for i, t in self.gaps.items() if now - t < EVENTS_GAP_SECONDS}
+                polls += 1
+                if polls % 3600 == 0:
+                    await asyncio.to_thread(self._prune)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event poll error: {e}")
+            await asyncio.sleep(EVENTS_POLL_SECONDS)
+
+    async def start(self):
+        broadcaster.loop = asyncio.get_running_loop()
+        self.last_id = await asyncio.to_thread(self._latest_id)
+        self.task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+channel: EventChannel = LocalChannel() if EVENTS_CHANNEL == "local" else DatabaseChannel()
+
+
+def publish_document_event(db: Session, doc: Document, event_type: str):
+    """Announce a document status transition to the owner's connected clients."""
+    status = doc.status.value if doc.status else None
+    try:
+        channel.publish(db, doc.owner_id, doc.id, event_type, status)
+    except Exception as e:
+        # Clients resync on reconnect; never fail the request over a notification
+        db.rollback()
+        print(f"Event publish error: {e}")
+
+
+def format_sse(event: dict) -> str:
+    data = {k: v for k, v in event.items() if k != "user_id"}
+    return f"id: {event['id']}\nevent: {event['event_type']}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_user_events(request, user_id: str, last_event_id: int = 0):
+    """
+    SSE generator for one client: replays anything missed since Last-Event-ID,
+    then forwards live events, with comment heartbeats to keep proxies open.
+    """
+    queue = broadcaster.subscribe(user_id)  # Subscribe before replay so nothing falls in the gap
+    # Ids can arrive out of order (late commits), so duplicates are found by id, not by "<= last"
+    sent_ids: Set[int] = set()
+    sent_order = deque(maxlen=EVENTS_REPLAY_LIMIT * 2)
+
+    def mark_sent(event_id: int) -> bool:
+        if event_id in sent_ids:
+            return False
+        if len(sent_order) == sent_order.maxlen:
+            sent_ids.discard(sent_order[0])
+        sent_order.append(event_id)
+        sent_ids.add(event_id)
+        return True
+
+    try:
+        yield "retry: 3000\n\n"
+        if last_event_id and not await asyncio.to_thread(channel.can_replay, last_event_id):
+            # Missed events are gone; tell the client to reload its state instead
+            yield "event: reset\ndata: {}\n\n"
+        elif last_event_id:
+            for event in await asyncio.to_thread(channel.replay, user_id, last_event_id):
+                mark_sent(event["id"])
+                yield format_sse(event)
+
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if not mark_sent(event["id"]):
+                continue
+            yield format_sse(event)
+    finally:
+        broadcaster.unsubscribe(user_id, queue)
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from typing import Optional
+from sqlalchemy.orm import Session
+from models.document import Document, DocumentStatus
+from models.signature import Signature
+from services.audit_service import log_event
+from services.pdf_service import embed_signatures_into_pdf, get_signed_pdf_key
+from services.storage_service import get_storage
+from services.event_service import publish_document_event
+
+
+class FinalizeError(Exception):
+    """Finalize cannot succeed no matter how often it is retried."""
+
+
+def finalize_document(
+    db: Session,
+    document_id: str,
+    user_id: Optional[str] = None,
+    actor_email: Optional[str] = None,
+    ip_address: Optional[str] = None,
+) -> dict:
+    """
+    Embed all signatures into the document's PDF, store the signed copy and
+    lock the document. Raises FinalizeError for permanent failures and any
+    other exception for failures worth retrying.
+    """
+    doc = db.query(Document).filter(Document.id == document_id).first()
+    if not doc:
+        raise FinalizeError("Document not found")
+
+    storage = get_storage()
+    output_key = get_signed_pdf_key(doc.id, doc.filename)
+    # Campaign recipients' signatures live on the template too but are embedded per recipient
+    signatures = db.query(Signature).filter(Signature.document_id == doc.id, Signature.recipient_id.is_(None)).all()
+
+    if doc.status == DocumentStatus.SIGNED and doc.signed_file_path == output_key and storage.exists(output_key):
+        # A previous attempt got this far before its job was marked done; don't embed twice
+        return {"document_id": doc.id, "signature_count": len(signatures)}
+
+    if not signatures:
+        raise FinalizeError("No signatures found to embed")
+
+    with storage.local_path(doc.file_path) as source_path, tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "signed.pdf")
+        if not embed_signatures_into_pdf(source_path, output_path, signatures, doc.page_geometry):
+            raise RuntimeError("PDF generation failed")
+        storage.put_file(output_key, output_path)
+
+    doc.signed_file_path = output_key
+    doc.status = DocumentStatus.SIGNED
+    db.commit()
+    publish_document_event(db, doc, "finalized")
+
+    log_event(
+        db, document_id=doc.id, event_type="finalized",
+        user_id=user_id, actor_email=actor_email,
+        event_detail=f"Document finalized with {len(signatures)} signature(s)",
+        ip_address=ip_address,
+    )
+    return {"document_id": doc.id, "signature_count": len(signatures)}
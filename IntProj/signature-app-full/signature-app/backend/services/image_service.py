@@ -0,0 +1,100 @@
+import base64
+import binascii
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+from PIL import Image
+
+
+SIGNATURE_DPI = int(os.getenv("SIGNATURE_DPI", "200"))
+SIGNATURE_PALETTE_COLORS = int(os.getenv("SIGNATURE_PALETTE_COLORS", "16"))
+SIGNATURE_CACHE_SIZE = int(os.getenv("SIGNATURE_CACHE_SIZE", "256"))
+
+# Formats an already-small upload may be kept in as-is (PyMuPDF embeds these directly)
+PASSTHROUGH_FORMATS = {"PNG": "image/png", "JPEG": "image/jpeg"}
+
+
+class InvalidSignatureImage(ValueError):
+    pass
+
+
+# (sha256 of the decoded image, max width, max height) -> normalized data URL.
+# Keyed by digest so the cache never holds the uploaded base64 strings themselves.
+_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _decode_data_url(data: str) -> bytes:
+    if "," in data:
+        data = data.split(",")[1]
+    try:
+        return base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidSignatureImage("Signature data is not valid base64")
+
+
+def target_pixel_size(box_width_pt: float, box_height_pt: float) -> Tuple[int, int]:
+    """Pixel dimensions a placement box needs at SIGNATURE_DPI (1pt = 1/72in)."""
+    scale = SIGNATURE_DPI / 72
+    return max(1, round(box_width_pt * scale)), max(1, round(box_height_pt * scale))
+
+
+def _normalize(raw: bytes, max_width: int, max_height: int) -> str:
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+    except Exception:
+        raise InvalidSignatureImage("Signature data is not a readable image")
+
+    original_format = img.format
+    img = img.convert("RGBA")
+
+    # Trim fully transparent margins around the ink
+    bbox = img.getchannel("A").getbbox()
+    if not bbox:
+        raise InvalidSignatureImage("Signature image is empty")
+    img = img.crop(bbox)
+
+    # Never store more pixels than the placement box can show when printed
+    scale = min(1.0, max_width / img.width, max_height / img.height)
+    if scale < 1.0:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+
+    # Ink is a handful of colours; a small palette with per-entry alpha is enough
+    img = img.quantize(colors=SIGNATURE_PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+
+    out = io.BytesIO()
+    img.save(out, format="PNG", optimize=True)
+    encoded = out.getvalue()
+    # Already-tight uploads (small JPEGs, optimized PNGs) can come out larger; keep those as they were
+    if original_format in PASSTHROUGH_FORMATS and len(raw) <= len(encoded):
+        return f"data:{PASSTHROUGH_FORMATS[original_format]};base64," + base64.b64encode(raw).decode("ascii")
+    return "data:image/png;base64," + base64.b64encode(encoded).decode("ascii")
+
+
+def normalize_signature_image(data: str, box_width_pt: float, box_height_pt: float) -> str:
+    """
+    Decode a base64 signature image once, trim transparent padding, downscale
+    to the placement box's print resolution and re-encode as a palette PNG,
+    unless the uploaded PNG/JPEG was already smaller than that.
+    Results are cached, so repeated placements of the same image are free.
+    Raises InvalidSignatureImage if the data cannot be used.
+    """
+    max_width, max_height = target_pixel_size(box_width_pt, box_height_pt)
+    raw = _decode_data_url(data)
+    key = (hashlib.sha256(raw).hexdigest(), max_width, max_height)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    normalized = _normalize(raw, max_width, max_height)
+    with _cache_lock:
+        _cache[key] = normalized
+        if len(_cache) > SIGNATURE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return normalized
@@ -0,0 +1,343 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal, mark_recent_write
+from models.document import Document
+from models.job import Job, JobStatus
+from services.document_service import expire_overdue_documents
+from services.event_service import publish_document_event
+from services.finalize_service import FinalizeError, finalize_document
+from services.campaign_service import CampaignError, finalize_campaign
+
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "5"))
+JOB_MAX_BACKOFF_SECONDS = float(os.getenv("JOB_MAX_BACKOFF_SECONDS", "600"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))  # Running jobs not heard from this long are reclaimed
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "1"))
+EXPIRY_SWEEP_SECONDS = float(os.getenv("EXPIRY_SWEEP_SECONDS", "60"))
+# Dev convenience: also drain the job queue from the API process when no worker is running
+JOBS_RUN_IN_API = os.getenv("JOBS_RUN_IN_API", "false").lower() == "true"
+
+
+def _run_finalize(db: Session, job: Job) -> dict:
+    payload = job.payload or {}
+    return finalize_document(
+        db, job.document_id,
+        user_id=job.user_id,
+        actor_email=payload.get("actor_email"),
+        ip_address=payload.get("ip_address"),
+    )
+
+
+def _run_campaign_finalize(db: Session, job: Job) -> dict:
+    payload = job.payload or {}
+    return finalize_campaign(
+        db, payload.get("campaign_id"),
+        user_id=job.user_id,
+        actor_email=payload.get("actor_email"),
+        ip_address=payload.get("ip_address"),
+    )
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], dict]] = {
+    "finalize": _run_finalize,
+    "campaign_finalize": _run_campaign_finalize,
+}
+
+PERMANENT_ERRORS = (FinalizeError, CampaignError)
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used for a job on another document."""
+
+
+def find_job_by_idempotency_key(db: Session, user_id: str, idempotency_key: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.user_id == user_id, Job.idempotency_key == idempotency_key).first()
+
+
+def find_active_job(db: Session, dedupe_key: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.dedupe_key == dedupe_key).first()
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    document_id: str,
+    user_id: Optional[str] = None,
+    payload: Optional[dict] = None,
+    dedupe_key: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+) -> Tuple[Job, bool]:
+    """
+    Persist a job so any worker can pick it up. Returns (job, created).
+    If another job already holds `dedupe_key` or this user's
+    `idempotency_key`, that job is returned instead; the unique constraints
+    make this hold even for requests racing on different API nodes.
+    Raises IdempotencyConflict if the key's job is for another document.
+    """
+    job = Job(
+        job_type=job_type,
+        document_id=document_id,
+        user_id=user_id,
+        payload=payload,
+        dedupe_key=dedupe_key,
+        idempotency_key=idempotency_key,
+        status=JobStatus.QUEUED,
+        max_attempts=JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = None
+        if idempotency_key and user_id:
+            existing = find_job_by_idempotency_key(db, user_id, idempotency_key)
+            if existing and existing.document_id != document_id:
+                raise IdempotencyConflict("Idempotency-Key was already used for another document")
+        if not existing and dedupe_key:
+            existing = find_active_job(db, dedupe_key)
+        if not existing:
+            raise
+        return existing, False
+    db.refresh(job)
+    return job, True
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """
+    Claim the oldest runnable job. On Postgres the candidate row is locked
+    with FOR UPDATE SKIP LOCKED so workers never block each other; SQLite
+    ignores the lock clause, so the conditional UPDATE below is what
+    guarantees only one worker wins a given job.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_LEASE_SECONDS)
+    candidate = (
+        db.query(Job)
+        .filter(or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(
+                Job.status == JobStatus.RUNNING,
+                Job.locked_at < stale_before,
+                Job.attempts < Job.max_attempts,  # Exhausted ones are failed by fail_abandoned_jobs
+            ),
+        ))
+        .order_by(Job.run_after)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not candidate:
+        db.rollback()
+        return None
+
+    claimed = (
+        db.query(Job)
+        .filter(
+            Job.id == candidate.id,
+            Job.status == candidate.status,
+            Job.attempts == candidate.attempts,
+        )
+        .update(
+            {
+                Job.status: JobStatus.RUNNING,
+                Job.locked_by: worker_id,
+                Job.locked_at: now,
+                Job.attempts: candidate.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not claimed:
+        return None
+    db.refresh(candidate)
+    return candidate
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), JOB_MAX_BACKOFF_SECONDS))
+
+
+def _holds_lease(job_id: str, worker_id: str, attempts: int):
+    """Filter matching a job only while this worker's claim on it (this attempt) is still current."""
+    return and_(
+        Job.id == job_id,
+        Job.status == JobStatus.RUNNING,
+        Job.locked_by == worker_id,
+        Job.attempts == attempts,
+    )
+
+
+@contextmanager
+def _lease_heartbeat(job_id: str, worker_id: str, attempts: int):
+    """
+    Keep refreshing locked_at while a job runs, so a job that legitimately
+    takes longer than JOB_LEASE_SECONDS isn't reclaimed and run twice. Only
+    a worker that dies stops heartbeating and loses the job.
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                db.query(Job).filter(_holds_lease(job_id, worker_id, attempts)).update(
+                    {Job.locked_at: datetime.utcnow()}, synchronize_session=False
+                )
+                db.commit()
+            except Exception as e:
+                print(f"Job heartbeat error: {e}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(db: Session, job: Job):
+    """
+    Run a claimed job and record success, a retry with back-off, or failure.
+    The outcome is written only if this worker still holds the job; if the
+    lease was lost and the job reclaimed, the other worker's run owns it.
+    """
+    worker_id, attempts = job.locked_by, job.attempts
+    outcome = {Job.locked_by: None, Job.locked_at: None}
+    handler = JOB_HANDLERS.get(job.job_type)
+    if not handler:
+        outcome.update({Job.status: JobStatus.FAILED, Job.last_error: f"Unknown job type '{job.job_type}'"})
+    else:
+        try:
+            with _lease_heartbeat(job.id, worker_id, attempts):
+                result = handler(db, job)
+        except Exception as e:
+            db.rollback()
+            outcome[Job.last_error] = f"{type(e).__name__}: {e}"
+            if isinstance(e, PERMANENT_ERRORS) or attempts >= job.max_attempts:
+                outcome[Job.status] = JobStatus.FAILED
+            else:
+                outcome[Job.status] = JobStatus.QUEUED
+                outcome[Job.run_after] = datetime.utcnow() + _backoff(attempts)
+            if not isinstance(e, PERMANENT_ERRORS):
+                traceback.print_exc()
+        else:
+            outcome.update({Job.status: JobStatus.SUCCEEDED, Job.result: result, Job.last_error: None})
+    if outcome[Job.status] in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+        outcome[Job.dedupe_key] = None  # Release so a later job for the same key can be queued
+
+    recorded = db.query(Job).filter(_holds_lease(job.id, worker_id, attempts)).update(
+        outcome, synchronize_session=False
+    )
+    db.commit()
+    if not recorded:
+        print(f"Job {job.id} was reclaimed by another worker; discarding this run's outcome")
+        return
+    db.refresh(job)
+    if job.status == JobStatus.SUCCEEDED and job.user_id:
+        mark_recent_write(job.user_id)  # Covers this process; other nodes learn it when the job is polled
+
+    if job.status == JobStatus.FAILED:
+        _publish_failure(db, job)
+
+
+def _publish_failure(db: Session, job: Job):
+    if job.job_type == "finalize":
+        doc = db.query(Document).filter(Document.id == job.document_id).first()
+        if doc:
+            publish_document_event(db, doc, "finalize_failed")
+
+
+def fail_abandoned_jobs() -> int:
+    """
+    Fail running jobs whose worker stopped heartbeating on their last
+    allowed attempt. claim_next_job won't retry them, and without this
+    they would hold their dedupe key forever. Returns jobs failed.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    db = SessionLocal()
+    failed = 0
+    try:
+        abandoned = db.query(Job).filter(
+            Job.status == JobStatus.RUNNING,
+            Job.locked_at < stale_before,
+            Job.attempts >= Job.max_attempts,
+        ).all()
+        for job in abandoned:
+            updated = db.query(Job).filter(
+                _holds_lease(job.id, job.locked_by, job.attempts),
+                Job.locked_at < stale_before,  # A late heartbeat means the worker is alive after all
+            ).update(
+                {
+                    Job.status: JobStatus.FAILED,
+                    Job.last_error: "Worker stopped responding during the last attempt",
+                    Job.dedupe_key: None,
+                    Job.locked_by: None,
+                    Job.locked_at: None,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            if updated:
+                failed += 1
+                _publish_failure(db, job)
+    finally:
+        db.close()
+    return failed
+
+
+def run_pending_jobs(worker_id: Optional[str] = None, limit: Optional[int] = None) -> int:
+    """Claim and run jobs until the queue is empty (or `limit` is reached). Returns jobs run."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    processed = 0
+    db = SessionLocal()
+    try:
+        while limit is None or processed < limit:
+            job = claim_next_job(db, worker_id)
+            if not job:
+                break
+            run_job(db, job)
+            processed += 1
+    finally:
+        db.close()
+    return processed
+
+
+def run_worker(worker_id: Optional[str] = None):
+    """Poll for jobs forever; run one of these per worker process."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"👷 Worker {worker_id} started")
+    next_sweep = 0.0
+    while True:
+        # Links lapse without anyone clicking them; expire those documents so owners get the event
+        if time.monotonic() >= next_sweep:
+            try:
+                expired = expire_overdue_documents()
+                if expired:
+                    print(f"⌛ Expired {expired} document(s) with lapsed signing links")
+            except Exception as e:
+                print(f"Expiry sweep error: {e}")
+            try:
+                abandoned = fail_abandoned_jobs()
+                if abandoned:
+                    print(f"💀 Failed {abandoned} job(s) abandoned on their last attempt")
+            except Exception as e:
+                print(f"Abandoned job sweep error: {e}")
+            next_sweep = time.monotonic() + EXPIRY_SWEEP_SECONDS
+        if not run_pending_jobs(worker_id):
+            time.sleep(WORKER_POLL_SECONDS)
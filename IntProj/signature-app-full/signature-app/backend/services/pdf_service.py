@@ -1,19 +1,28 @@
 import fitz  # PyMuPDF
 import base64
-import io
 import os
-from PIL import Image
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 from models.signature import Signature
+from services.storage_service import get_storage
+from services.vector_service import STROKES_PREFIX, TEXT_PREFIX, parse_strokes
 
 
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+SIGNATURE_FONT_FILE = os.getenv("SIGNATURE_FONT_FILE")  # Optional TTF/OTF embedded for typed signatures
+SIGNATURE_INK = (0.10, 0.08, 0.06)
 
 
-def get_pdf_page_count(file_path: str) -> int:
+def _open_pdf(source: Union[str, bytes]) -> fitz.Document:
+    """Open a PDF from a local path or from in-memory bytes."""
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def get_pdf_page_count(source: Union[str, bytes]) -> int:
     """Return the number of pages in a PDF."""
     try:
-        doc = fitz.open(file_path)
+        doc = _open_pdf(source)
         count = doc.page_count
         doc.close()
         return count
@@ -21,53 +30,285 @@ def get_pdf_page_count(file_path: str) -> int:
         return 1
 
 
+def extract_page_geometry(source: Union[str, bytes]) -> List[dict]:
+    """
+    Open the PDF once and return a compact record per page: displayed size,
+    rotation, mediabox, cropbox offset and whether the page carries text.
+    Stored on the Document so later steps never reopen the file for sizes.
+    """
+    doc = _open_pdf(source)
+    try:
+        return [{**_page_record(page), "has_text": bool(page.get_text("text").strip())} for page in doc]
+    finally:
+        doc.close()
+
+
+def _page_record(page: fitz.Page) -> dict:
+    rect, mediabox, cropbox = page.rect, page.mediabox, page.cropbox
+    return {
+        "width": round(rect.width, 2),
+        "height": round(rect.height, 2),
+        "rotation": page.rotation,
+        "mediabox": [round(v, 2) for v in mediabox],
+        # PyMuPDF gives the mediabox in PDF coordinates but the cropbox with y measured
+        # down from the mediabox top, so this is the cropbox's offset from the top-left corner
+        "cropbox_offset": [round(cropbox.x0 - mediabox.x0, 2), round(cropbox.y0, 2)],
+    }
+
+
+def extract_text(source: Union[str, bytes], max_chars: Optional[int] = None) -> str:
+    """Extract the text of every page in reading order, stopping once max_chars is reached."""
+    doc = _open_pdf(source)
+    try:
+        parts, total = [], 0
+        for page in doc:
+            text = page.get_text("text", sort=True).strip()
+            if text:
+                parts.append(text)
+                total += len(text)
+            if max_chars and total >= max_chars:
+                break
+        content = "\n\n".join(parts)
+        return content[:max_chars] if max_chars else content
+    finally:
+        doc.close()
+
+
+def _displayed_rect(page: dict, x_pct: float, y_pct: float, w_pct: float, h_pct: float) -> fitz.Rect:
+    """Percentage placement as points on the page as a viewer shows it (rotated, cropped, top-left origin)."""
+    x = (x_pct / 100) * page["width"]
+    y = (y_pct / 100) * page["height"]
+    w = (w_pct / 100) * page["width"]
+    h = (h_pct / 100) * page["height"]
+    return fitz.Rect(x, y, x + w, y + h)
+
+
+def displayed_to_pdf_matrix(page: dict) -> fitz.Matrix:
+    """
+    Matrix from displayed page coordinates to PDF user space, undoing the
+    page's /Rotate and moving the origin to the cropbox corner the viewer
+    shows at the top left.
+    """
+    rotation = page.get("rotation", 0) % 360
+    width, height = page["width"], page["height"]
+    # The cropbox's unrotated size; /Rotate 90 and 270 swap what is displayed
+    crop_w, crop_h = (height, width) if rotation in (90, 270) else (width, height)
+    mediabox = page.get("mediabox") or [0, 0, crop_w, crop_h]
+    offset_x, offset_y = page.get("cropbox_offset") or [0, 0]
+    x0 = mediabox[0] + offset_x
+    y1 = mediabox[3] - offset_y
+    x1, y0 = x0 + crop_w, y1 - crop_h
+    return {
+        0: fitz.Matrix(1, 0, 0, -1, x0, y1),
+        90: fitz.Matrix(0, 1, 1, 0, x0, y0),
+        180: fitz.Matrix(-1, 0, 0, 1, x1, y0),
+        270: fitz.Matrix(0, -1, -1, 0, x1, y1),
+    }[rotation]
+
+
+def signature_rect_on_page(page: dict, x_pct: float, y_pct: float, w_pct: float, h_pct: float) -> fitz.Rect:
+    """
+    Convert a percentage placement on the displayed page into a rect in PDF
+    user space, applying the geometry record's rotation and cropbox offset.
+    """
+    return _displayed_rect(page, x_pct, y_pct, w_pct, h_pct) * displayed_to_pdf_matrix(page)
+
+
+def signature_box_size(page: dict, w_pct: float, h_pct: float) -> Tuple[float, float]:
+    """Width and height in points of a placement box as the signer sees it."""
+    return (w_pct / 100) * page["width"], (h_pct / 100) * page["height"]
+
+
+def validate_signature_placement(
+    page_geometry: Optional[List[dict]],
+    page_count: int,
+    page_number: int,
+    x_pct: float,
+    y_pct: float,
+    w_pct: float,
+    h_pct: float,
+) -> Optional[str]:
+    """Return an error message if the placement falls outside the document, else None."""
+    total = len(page_geometry) if page_geometry else page_count
+    if page_number < 1 or page_number > total:
+        return f"Page {page_number} is out of range (document has {total} pages)"
+    if not (0 <= x_pct <= 100 and 0 <= y_pct <= 100):
+        return "Signature position must be within the page (0-100%)"
+    if w_pct <= 0 or h_pct <= 0:
+        return "Signature width and height must be positive"
+    if page_geometry:
+        page = page_geometry[page_number - 1]
+        rect = _displayed_rect(page, x_pct, y_pct, w_pct, h_pct)
+        if rect.is_empty or not rect.intersects(fitz.Rect(0, 0, page["width"], page["height"])):
+            return f"Signature does not fall on page {page_number}"
+    return None
+
+
+def _fit_box(rect: fitz.Rect, width: float, height: float):
+    """Scale and offset that fit a width x height box centred inside rect, keeping its aspect ratio."""
+    scale = min(rect.width / width, rect.height / height)
+    return scale, rect.x0 + (rect.width - width * scale) / 2, rect.y0 + (rect.height - height * scale) / 2
+
+
+def _drawing_matrices(page: fitz.Page, geometry: dict) -> Tuple[fitz.Matrix, fitz.Matrix]:
+    """
+    Matrices from displayed coordinates to what PyMuPDF's drawing calls
+    (shapes, images) and text calls expect. The two differ: text insertion
+    positions relative to the cropbox itself, while shapes go through
+    page.transformation_matrix, which on rotated pages leaves out the
+    cropbox offset.
+    """
+    to_pdf = displayed_to_pdf_matrix(geometry)
+    crop = page.cropbox_position
+    text_space = fitz.Matrix(1, 0, 0, -1, -crop.x, page.mediabox_size.y - crop.y)
+    return to_pdf * page.transformation_matrix, to_pdf * text_space
+
+
+def draw_stroke_signature(page: fitz.Page, rect: fitz.Rect, data: str, matrix: fitz.Matrix = fitz.Identity):
+    """
+    Draw stroke data as vector paths, so the signature stays sharp at any zoom.
+    `rect` is in displayed coordinates and `matrix` maps them to drawing coordinates.
+    """
+    width, height, pen, strokes = parse_strokes(data)
+    scale, dx, dy = _fit_box(rect, width, height)
+    shape = page.new_shape()
+    for points in strokes:
+        mapped = [fitz.Point(dx + x * scale, dy + y * scale) * matrix for x, y in points]
+        if len(mapped) == 1:
+            shape.draw_circle(mapped[0], pen * scale / 2)
+            shape.finish(color=None, fill=SIGNATURE_INK, width=0)
+        else:
+            shape.draw_polyline(mapped)
+            shape.finish(color=SIGNATURE_INK, width=pen * scale, lineCap=1, lineJoin=1, closePath=False)
+    shape.commit()
+
+
+@lru_cache(maxsize=1)
+def _signature_fonts() -> List[Tuple[fitz.Font, dict]]:
+    """Typed-signature fonts in order of preference, each with its insert_text options."""
+    fonts = []
+    if SIGNATURE_FONT_FILE:
+        fonts.append((fitz.Font(fontfile=SIGNATURE_FONT_FILE), {"fontname": "SigFont", "fontfile": SIGNATURE_FONT_FILE}))
+    fonts.append((fitz.Font("tiit"), {"fontname": "tiit"}))
+    return fonts
+
+
+def signature_font_for(text: str) -> Optional[Tuple[fitz.Font, dict]]:
+    """
+    The first typed-signature font that can render every character of the
+    text, or None. The built-in Times-Italic is written with a single-byte
+    encoding, so it only covers Latin-1 whatever glyphs the font program has.
+    """
+    for font, options in _signature_fonts():
+        if options["fontname"] == "tiit":
+            covered = all(ord(ch) < 256 for ch in text)
+        else:
+            covered = all(ch == " " or font.has_glyph(ord(ch)) for ch in text)
+        if covered:
+            return font, options
+    return None
+
+
+def draw_typed_signature(page: fitz.Page, rect: fitz.Rect, data: str, matrix: fitz.Matrix = fitz.Identity):
+    """
+    Write a typed signature as real text, sized to fill the box. Uses the
+    embedded SIGNATURE_FONT_FILE when configured and it covers the text, else
+    the built-in Times-Italic (which needs no embedding at all). `rect` is in
+    displayed coordinates and `matrix` maps them to text coordinates; the
+    text is turned with the page so it reads upright.
+    """
+    text = data[len(TEXT_PREFIX):]
+    choice = signature_font_for(text)
+    if not choice:
+        # Checked when the signature is saved; only reachable if the font config changed since
+        raise ValueError("No configured font can render the typed signature")
+    font, options = choice
+    # At fontsize 1 the text is text_length wide and ascender - descender tall
+    fontsize, x, y = _fit_box(rect, max(font.text_length(text, fontsize=1), 0.01), font.ascender - font.descender)
+    page.insert_text(
+        fitz.Point(x, y + font.ascender * fontsize) * matrix,
+        text,
+        fontsize=fontsize,
+        color=SIGNATURE_INK,
+        rotate=page.rotation,
+        **options,
+    )
+
+
+def render_typed_signature_preview(text: str, width: float = 320, height: float = 120, zoom: float = 2) -> bytes:
+    """
+    PNG of a typed signature drawn exactly as the embedder will draw it
+    (same font choice, same fit), so the signer previews what gets signed.
+    Raises ValueError if no configured font can render the text.
+    """
+    doc = fitz.open()
+    try:
+        page = doc.new_page(width=width, height=height)
+        draw_typed_signature(page, page.rect + (8, 8, -8, -8), TEXT_PREFIX + text)
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+    finally:
+        doc.close()
+
+
 def embed_signatures_into_pdf(
     source_pdf_path: str,
     output_pdf_path: str,
-    signatures: List[Signature]
+    signatures: List[Signature],
+    page_geometry: Optional[List[dict]] = None,
 ) -> bool:
     """
-    Embed signature images into the PDF at the specified positions.
-    Positions are stored as percentages of page dimensions.
+    Embed signatures into the PDF at the specified positions. Vector
+    signatures are drawn as paths or text, raster ones inserted as images.
+    Positions are stored as percentages of the page as displayed; the
+    document's page geometry (or the page itself) supplies the rotation and
+    cropbox needed to map them into the PDF.
     """
     try:
         doc = fitz.open(source_pdf_path)
 
+        # Identical signature images are decoded and embedded once, then
+        # referenced by xref on every other placement
+        image_xrefs = {}
+
         for sig in signatures:
             if not sig.signature_data:
                 continue
 
-            # Decode base64 signature image
-            img_data = sig.signature_data
-            if "," in img_data:
-                img_data = img_data.split(",")[1]
-
-            img_bytes = base64.b64decode(img_data)
-
             # Get target page (0-indexed)
             page_idx = sig.page_number - 1
             if page_idx < 0 or page_idx >= doc.page_count:
                 continue
 
             page = doc[page_idx]
-            page_rect = page.rect
+            if page_geometry and page_idx < len(page_geometry):
+                geometry = page_geometry[page_idx]
+            else:
+                geometry = _page_record(page)
 
-            # Convert percentage positions to absolute pixel coords
-            x = (sig.x_position / 100) * page_rect.width
-            y = (sig.y_position / 100) * page_rect.height
-            w = (sig.width / 100) * page_rect.width
-            h = (sig.height / 100) * page_rect.height
+            # Lay the signature out as the signer saw the page, then map it into the PDF
+            rect = _displayed_rect(geometry, sig.x_position, sig.y_position, sig.width, sig.height)
+            x, y, w, h = rect.x0, rect.y0, rect.width, rect.height
+            to_drawing, to_text = _drawing_matrices(page, geometry)
 
-            rect = fitz.Rect(x, y, x + w, y + h)
-
-            # Insert image
-            page.insert_image(rect, stream=img_bytes)
+            if sig.signature_data.startswith(STROKES_PREFIX):
+                draw_stroke_signature(page, rect, sig.signature_data, to_drawing)
+            elif sig.signature_data.startswith(TEXT_PREFIX):
+                draw_typed_signature(page, rect, sig.signature_data, to_text)
+            elif xref := image_xrefs.get(sig.signature_data):
+                page.insert_image(rect * to_drawing, xref=xref, rotate=page.rotation)
+            else:
+                img_data = sig.signature_data
+                if "," in img_data:
+                    img_data = img_data.split(",")[1]
+                image_xrefs[sig.signature_data] = page.insert_image(
+                    rect * to_drawing, stream=base64.b64decode(img_data), rotate=page.rotation
+                )
 
             # Add a subtle annotation line below the signature
             line_y = y + h + 2
             page.draw_line(
-                fitz.Point(x, line_y),
-                fitz.Point(x + w, line_y),
+                fitz.Point(x, line_y) * to_drawing,
+                fitz.Point(x + w, line_y) * to_drawing,
                 color=(0.4, 0.4, 0.4),
                 width=0.5
             )
@@ -75,14 +316,18 @@ def embed_signatures_into_pdf(
             # Add signer name below line if available
             if sig.signer_name:
                 page.insert_text(
-                    fitz.Point(x, line_y + 10),
+                    fitz.Point(x, line_y + 10) * to_text,
                     f"Signed by: {sig.signer_name}",
                     fontsize=7,
-                    color=(0.4, 0.4, 0.4)
+                    color=(0.4, 0.4, 0.4),
+                    rotate=page.rotation,
                 )
 
-        # Save the finalized PDF
+        # Callers write into a private temp dir and publish via storage.put_file,
+        # which is atomic, so the PDF is saved straight to output_pdf_path
         os.makedirs(os.path.dirname(output_pdf_path), exist_ok=True)
+        if SIGNATURE_FONT_FILE:
+            doc.subset_fonts()  # Only keep the glyphs the typed signatures use
         doc.save(output_pdf_path, garbage=4, deflate=True)
         doc.close()
         return True
@@ -92,19 +337,53 @@ def embed_signatures_into_pdf(
         return False
 
 
-def save_uploaded_pdf(file_bytes: bytes, filename: str, document_id: str) -> str:
-    """Save uploaded PDF to disk and return path."""
-    doc_dir = os.path.join(UPLOAD_DIR, document_id)
-    os.makedirs(doc_dir, exist_ok=True)
-    file_path = os.path.join(doc_dir, filename)
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
-    return file_path
+def get_upload_key(document_id: str, filename: str) -> str:
+    """Get the storage key for an uploaded PDF."""
+    return f"{document_id}/{os.path.basename(filename)}"
+
+
+def save_uploaded_pdf(source: Union[str, bytes], filename: str, document_id: str) -> str:
+    """Save an uploaded PDF (bytes or a local file path) to the storage backend and return its key."""
+    key = get_upload_key(document_id, filename)
+    if isinstance(source, bytes):
+        get_storage().put(key, source)
+    else:
+        get_storage().put_file(key, source)
+    return key
+
+
+def get_optimized_pdf_key(document_id: str, filename: str) -> str:
+    """Get the storage key for the optimized copy of an uploaded PDF."""
+    base = os.path.splitext(os.path.basename(filename))[0]
+    return f"{document_id}/{base}_optimized.pdf"
+
+
+def optimize_pdf(source_pdf_path: str, output_pdf_path: str) -> int:
+    """
+    Write a compacted, web-linearized copy of a PDF and return its size in bytes.
+    garbage=4 drops unused objects and merges duplicates (fonts, images),
+    and all streams are deflated. Falls back to a non-linear save if the
+    installed MuPDF no longer supports linearization.
+    """
+    doc = fitz.open(source_pdf_path)
+    try:
+        options = dict(garbage=4, deflate=True, deflate_images=True, deflate_fonts=True, clean=True)
+        try:
+            doc.save(output_pdf_path, linear=True, **options)
+        except Exception:
+            doc.save(output_pdf_path, **options)
+    finally:
+        doc.close()
+    return os.path.getsize(output_pdf_path)
+
+
+def get_campaign_signed_pdf_key(document_id: str, campaign_id: str, recipient_id: str, filename: str) -> str:
+    """Get the storage key for one campaign recipient's signed copy of a template."""
+    base = os.path.splitext(os.path.basename(filename))[0]
+    return f"{document_id}/campaigns/{campaign_id}/{recipient_id}_{base}_signed.pdf"
 
 
-def get_signed_pdf_path(document_id: str, filename: str) -> str:
-    """Get the output path for a signed PDF."""
-    doc_dir = os.path.join(UPLOAD_DIR, document_id)
-    os.makedirs(doc_dir, exist_ok=True)
-    base = os.path.splitext(filename)[0]
-    return os.path.join(doc_dir, f"{base}_signed.pdf")
+def get_signed_pdf_key(document_id: str, filename: str) -> str:
+    """Get the storage key for a signed PDF."""
+    base = os.path.splitext(os.path.basename(filename))[0]
+    return f"{document_id}/{base}_signed.pdf"
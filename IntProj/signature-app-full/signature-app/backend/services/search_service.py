@@ -0,0 +1,207 @@
+import html
+import os
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.document import Document
+from models.document_text import DocumentText
+from services.pdf_service import extract_text
+from services.storage_service import get_storage
+
+
+SEARCH_INDEX_ON_UPLOAD = os.getenv("SEARCH_INDEX_ON_UPLOAD", "true").lower() == "true"
+SEARCH_MAX_TEXT_CHARS = int(os.getenv("SEARCH_MAX_TEXT_CHARS", "2000000"))  # Per document
+
+# Highlight markers are control characters so the surrounding text can be
+# HTML-escaped before they are turned into <mark> tags
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_TERM_PATTERN = re.compile(r'"([^"]+)"|(\w+\*?)')
+
+
+class SearchUnavailable(Exception):
+    """Full-text search is not supported on the configured database."""
+
+
+def index_document_text(db: Session, doc: Document) -> DocumentText:
+    """
+    Extract the document's text once and store it for the search index.
+    Documents without a text layer (scans) still get an empty row, so they
+    are not picked up again by the backfill.
+    """
+    try:
+        with get_storage().local_path(doc.file_path) as path:
+            content = extract_text(path, SEARCH_MAX_TEXT_CHARS)
+    except Exception as e:
+        print(f"Text extraction error: {e}")
+        content = ""
+
+    record = db.query(DocumentText).filter(DocumentText.document_id == doc.id).first()
+    if record:
+        record.title = doc.title
+        record.content = content
+    else:
+        record = DocumentText(document_id=doc.id, owner_id=doc.owner_id, title=doc.title, content=content)
+        db.add(record)
+    db.commit()
+    return record
+
+
+def backfill_search_index(batch_size: int = 100) -> int:
+    """Index documents uploaded before search existed. Returns how many were indexed."""
+    db = SessionLocal()
+    indexed = 0
+    try:
+        while True:
+            docs = (
+                db.query(Document)
+                .outerjoin(DocumentText, DocumentText.document_id == Document.id)
+                .filter(DocumentText.id.is_(None))
+                .limit(batch_size)
+                .all()
+            )
+            if not docs:
+                break
+            for doc in docs:
+                try:
+                    if get_storage().exists(doc.file_path):
+                        index_document_text(db, doc)
+                        indexed += 1
+                    else:
+                        # Still record the row so the document isn't retried forever
+                        db.add(DocumentText(document_id=doc.id, owner_id=doc.owner_id, title=doc.title, content=""))
+                        db.commit()
+                except IntegrityError:
+                    db.rollback()  # Another worker indexed it first
+    finally:
+        db.close()
+    return indexed
+
+
+def _fts5_match(owner_id: str, query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 expression: "quoted phrases" and words are
+    ANDed, a trailing * makes a prefix match. Everything is quoted, so user
+    input can never inject FTS5 operators.
+    """
+    terms = []
+    for phrase, word in _TERM_PATTERN.findall(query):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif word.endswith("*"):
+            terms.append(f'"{word[:-1]}"*')
+        else:
+            terms.append(f'"{word}"')
+    if not terms:
+        return None
+    return f'owner_id:"{owner_id}" AND {{title content}}: ({" AND ".join(terms)})'
+
+
+def _render_highlight(value: Optional[str]) -> str:
+    return html.escape(value or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _search_sqlite(db: Session, owner_id: str, query: str, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+    match = _fts5_match(owner_id, query)
+    if not match:
+        return 0, []
+    total = db.execute(
+        text("SELECT count(*) FROM document_texts_fts WHERE document_texts_fts MATCH :match"),
+        {"match": match},
+    ).scalar()
+    rows = db.execute(
+        text(
+            """
+            SELECT t.document_id,
+                   bm25(document_texts_fts, 0.0, 10.0, 1.0) AS rank,
+                   highlight(document_texts_fts, 1, :start, :end) AS title_highlight,
+                   snippet(document_texts_fts, 2, :start, :end, '…', 24) AS snippet
+            FROM document_texts_fts
+            JOIN document_texts t ON t.id = document_texts_fts.rowid
+            WHERE document_texts_fts MATCH :match
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+            """
+        ),
+        {"match": match, "start": _MARK_START, "end": _MARK_END, "limit": limit, "offset": offset},
+    ).all()
+    # bm25 is lower-is-better; flip it so higher scores rank first for clients
+    return total, [(doc_id, -rank, title_hl, snippet) for doc_id, rank, title_hl, snippet in rows]
+
+
+def _search_postgres(db: Session, owner_id: str, query: str, limit: int, offset: int) -> Tuple[int, List[tuple]]:
+    params = {"owner_id": owner_id, "query": query, "limit": limit, "offset": offset}
+    total = db.execute(
+        text(
+            """
+            SELECT count(*) FROM document_texts
+            WHERE owner_id = :owner_id AND search_vector @@ websearch_to_tsquery('english', :query)
+            """
+        ),
+        params,
+    ).scalar()
+    # ts_headline re-parses the text, so it only runs on the page being returned
+    rows = db.execute(
+        text(
+            """
+            WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+            hits AS (
+                SELECT t.id, ts_rank_cd(t.search_vector, q.query) AS rank
+                FROM document_texts t, q
+                WHERE t.owner_id = :owner_id AND t.search_vector @@ q.query
+                ORDER BY rank DESC
+                LIMIT :limit OFFSET :offset
+            )
+            SELECT t.document_id, hits.rank,
+                   ts_headline('english', t.title, q.query, :title_options),
+                   ts_headline('english', t.content, q.query, :content_options)
+            FROM hits JOIN document_texts t ON t.id = hits.id, q
+            ORDER BY hits.rank DESC
+            """
+        ),
+        {
+            **params,
+            "title_options": f"StartSel={_MARK_START}, StopSel={_MARK_END}, HighlightAll=true",
+            "content_options": (
+                f"StartSel={_MARK_START}, StopSel={_MARK_END}, "
+                "MaxFragments=2, MaxWords=30, MinWords=10, FragmentDelimiter=\" … \""
+            ),
+        },
+    ).all()
+    return total, [tuple(row) for row in rows]
+
+
+def search_documents(db: Session, owner_id: str, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[dict]]:
+    """
+    Ranked full-text search over one owner's documents. Returns (total, hits)
+    where each hit has the Document, its score and HTML-escaped title and
+    snippet highlights with matches wrapped in <mark>.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        total, rows = _search_sqlite(db, owner_id, query, limit, offset)
+    elif dialect == "postgresql":
+        total, rows = _search_postgres(db, owner_id, query, limit, offset)
+    else:
+        raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+
+    docs = {}
+    if rows:
+        ids = [row[0] for row in rows]
+        docs = {d.id: d for d in db.query(Document).filter(Document.id.in_(ids))}
+    hits = [
+        {
+            "document": docs[doc_id],
+            "score": round(float(score), 4),
+            "title_highlight": _render_highlight(title_hl),
+            "snippet": _render_highlight(snippet),
+        }
+        for doc_id, score, title_hl, snippet in rows
+        if doc_id in docs
+    ]
+    return total, hits
@@ -0,0 +1,401 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")  # local | s3
+STORAGE_CACHE_DIR = os.getenv("STORAGE_CACHE_DIR")  # Optional read-through cache for remote backends
+STORAGE_CACHE_MAX_MB = int(os.getenv("STORAGE_CACHE_MAX_MB", "1024"))
+S3_BUCKET = os.getenv("S3_BUCKET", "signature-app")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # e.g. http://localhost:9000 for MinIO
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    Interface for where document files live. Keys are relative, slash
+    separated names such as "{document_id}/{filename}" so any API node
+    can resolve them against the shared backend.
+    """
+
+    @abstractmethod
+    def put(self, key: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def put_stream(self, key: str, chunks: Iterable[bytes]):
+        """Write an object from an iterable of byte chunks without buffering it whole."""
+
+    def put_file(self, key: str, source_path: str):
+        """Upload a local file, streaming it in chunks."""
+        with open(source_path, "rb") as f:
+            self.put_stream(key, iter(lambda: f.read(CHUNK_SIZE), b""))
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes start..end inclusive, matching HTTP Range semantics."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def head(self, key: str) -> Optional[Tuple[int, str]]:
+        """(size, version tag) of the object, or None if it doesn't exist. The tag changes on every rewrite."""
+
+    def filesystem_path(self, key: str) -> Optional[str]:
+        """Path of the object on local disk if it is already there, else None."""
+        return None
+
+    @contextmanager
+    def local_path(self, key: str):
+        """Yield a local file path holding the object, for libraries that need one."""
+        path = self.filesystem_path(key)
+        if path:
+            yield path
+            return
+        fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(key)[1])
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in self.open_stream(key):
+                    f.write(chunk)
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+
+class LocalStorage(StorageBackend):
+    """Files under a local (or shared network) directory."""
+
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # Absolute paths are rows written before storage keys were introduced
+        if os.path.isabs(key):
+            return key
+        return os.path.join(self.root, key)
+
+    def put(self, key: str, data: bytes):
+        self.put_stream(key, [data])
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def head(self, key: str) -> Optional[Tuple[int, str]]:
+        try:
+            stat = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return stat.st_size, f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def filesystem_path(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage (AWS S3, MinIO, ...). Requires boto3.
+    Point S3_ENDPOINT_URL at a local MinIO or moto server for testing.
+    """
+
+    MIN_PART_SIZE = 8 * 1024 * 1024  # S3 requires >= 5MB for all but the last part
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: Optional[str] = S3_ENDPOINT_URL, prefix: str = S3_PREFIX):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client_error = ClientError
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]):
+        buffer = bytearray()
+        chunks = iter(chunks)
+        # Small objects go up in a single request
+        for chunk in chunks:
+            buffer.extend(chunk)
+            if len(buffer) >= self.MIN_PART_SIZE:
+                break
+        else:
+            self.put(key, bytes(buffer))
+            return
+
+        upload = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key))
+        upload_id, parts = upload["UploadId"], []
+        try:
+            def flush(data: bytes):
+                part = self.client.upload_part(
+                    Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                    PartNumber=len(parts) + 1, Body=data,
+                )
+                parts.append({"PartNumber": len(parts) + 1, "ETag": part["ETag"]})
+
+            for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) >= self.MIN_PART_SIZE:
+                    flush(bytes(buffer))
+                    buffer.clear()
+            if buffer or not parts:
+                flush(bytes(buffer))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"].read()
+
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._key(key), Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except self._client_error:
+            return False
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["ContentLength"]
+
+    def head(self, key: str) -> Optional[Tuple[int, str]]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client_error:
+            return None
+        return response["ContentLength"], response["ETag"]
+
+
+class CachedStorage(StorageBackend):
+    """
+    Read-through local disk cache in front of a remote backend. Cached
+    copies are named after the object's version tag (ETag), and every read
+    checks the current tag with a HEAD first, so a file rewritten or deleted
+    through another node is never served stale. Least recently used files
+    are evicted once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, backend: StorageBackend, cache_dir: str, max_bytes: int):
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, key: str, tag: str) -> str:
+        # "{doc}/contract.pdf" -> "{doc}/contract.{digest}.pdf"; the extension stays last for PyMuPDF
+        root, ext = os.path.splitext(key.lstrip("/"))
+        digest = hashlib.sha1(tag.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{root}.{digest}{ext}")
+
+    def _current_path(self, key: str) -> str:
+        """Cache path for the backend's current version of key; FileNotFoundError if it is gone."""
+        info = self.backend.head(key)
+        if info is None:
+            self._invalidate(key)
+            raise FileNotFoundError(key)
+        return self._cache_path(key, info[1])
+
+    def _fetch(self, key: str) -> str:
+        path = self._current_path(key)
+        if os.path.exists(path):
+            os.utime(path)  # Touch for LRU eviction
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in self.backend.open_stream(key):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._evict()
+        return path
+
+    def _evict(self):
+        # Other threads and processes share the directory: in-flight downloads
+        # (.tmp) are left alone and files may vanish between walk, stat and remove
+        entries, total = [], 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _invalidate(self, key: str):
+        """Drop every cached version of key."""
+        root, ext = os.path.splitext(os.path.join(self.cache_dir, key.lstrip("/")))
+        directory, prefix = os.path.dirname(root), os.path.basename(root) + "."
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            rest = name[len(prefix):]
+            # Only "{root}.{16 hex digits}{ext}", not other keys that share the prefix
+            if name.startswith(prefix) and rest.endswith(ext) and len(rest) == 16 + len(ext):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def put(self, key: str, data: bytes):
+        self._invalidate(key)
+        self.backend.put(key, data)
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]):
+        self._invalidate(key)
+        self.backend.put_stream(key, chunks)
+
+    def get(self, key: str) -> bytes:
+        with open(self._fetch(key), "rb") as f:
+            return f.read()
+
+    def open_stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self._fetch(key), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        path = self._current_path(key)
+        if not os.path.exists(path):
+            # Don't pull a whole file into the cache for a single range request
+            return self.backend.read_range(key, start, end)
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def delete(self, key: str):
+        self._invalidate(key)
+        self.backend.delete(key)
+
+    def exists(self, key: str) -> bool:
+        return self.backend.head(key) is not None
+
+    def size(self, key: str) -> int:
+        return self.backend.size(key)
+
+    def head(self, key: str) -> Optional[Tuple[int, str]]:
+        return self.backend.head(key)
+
+    def filesystem_path(self, key: str) -> Optional[str]:
+        try:
+            return self._fetch(key)
+        except FileNotFoundError:
+            return None
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Return the configured storage backend (created on first use)."""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "s3":
+            backend = S3Storage()
+        else:
+            backend = LocalStorage()
+        if STORAGE_CACHE_DIR and not isinstance(backend, LocalStorage):
+            backend = CachedStorage(backend, STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_MB * 1024 * 1024)
+        _storage = backend
+    return _storage
+
@@ -0,0 +1,74 @@
+import os
+import tempfile
+from database import SessionLocal
+from models.document import Document
+from services.audit_service import log_event
+from services.pdf_service import get_optimized_pdf_key, optimize_pdf
+from services.search_service import SEARCH_INDEX_ON_UPLOAD, index_document_text
+from services.storage_service import get_storage
+
+
+PDF_OPTIMIZE_ON_UPLOAD = os.getenv("PDF_OPTIMIZE_ON_UPLOAD", "true").lower() == "true"
+
+
+def _format_size(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def optimize_document(db, doc: Document) -> bool:
+    """
+    Produce an optimized copy of the document's PDF and record the savings.
+    The copy is only kept if it is actually smaller than the original.
+    """
+    storage = get_storage()
+    original_size = doc.file_size or storage.size(doc.file_path)
+    output_key = get_optimized_pdf_key(doc.id, doc.filename)
+    with storage.local_path(doc.file_path) as source_path, tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "optimized.pdf")
+        try:
+            optimized_size = optimize_pdf(source_path, output_path)
+        except Exception as e:
+            print(f"PDF optimization error: {e}")
+            return False
+
+        doc.file_size = original_size
+        if optimized_size >= original_size:
+            db.commit()
+            return False
+        storage.put_file(output_key, output_path)
+
+    doc.optimized_file_path = output_key
+    doc.optimized_file_size = optimized_size
+    db.commit()
+
+    saved_pct = 100 * (original_size - optimized_size) / original_size
+    log_event(
+        db, document_id=doc.id, event_type="optimized",
+        event_detail=(
+            f"PDF optimized: {_format_size(original_size)} -> "
+            f"{_format_size(optimized_size)} ({saved_pct:.0f}% smaller)"
+        ),
+    )
+    return True
+
+
+def run_post_upload_stages(document_id: str):
+    """
+    Background pipeline run after an upload has been committed.
+    Uses its own session since it runs after the request has finished.
+    """
+    db = SessionLocal()
+    try:
+        doc = db.query(Document).filter(Document.id == document_id).first()
+        if not doc or not get_storage().exists(doc.file_path):
+            return
+        if SEARCH_INDEX_ON_UPLOAD:
+            index_document_text(db, doc)
+        if PDF_OPTIMIZE_ON_UPLOAD:
+            optimize_document(db, doc)
+    finally:
+        db.close()
@@ -0,0 +1,122 @@
+import math
+import re
+from typing import List, Tuple
+from models.signature import SignatureType
+
+
+# Vector signatures are stored in signature_data as short text instead of a PNG:
+#   drawn: "strokes:{width},{height},{pen};{x},{y},{dx},{dy},...;{x},{y},..."
+#          one ";"-separated stroke per pen-down, first point absolute and the
+#          rest as integer deltas, in a width x height box with pen line width
+#   typed: "text:{name}", rendered with a font at finalize
+STROKES_PREFIX = "strokes:"
+TEXT_PREFIX = "text:"
+
+MAX_STROKES = 500
+MAX_STROKE_POINTS = 20000  # Across all strokes
+MAX_STROKE_BOX = 10000  # Largest box side / coordinate magnitude, in stroke units
+MAX_PEN_WIDTH = 100
+MAX_TYPED_LENGTH = 100
+
+Point = Tuple[int, int]
+
+
+class InvalidVectorSignature(ValueError):
+    pass
+
+
+def is_vector_signature(data: str) -> bool:
+    return data.startswith(STROKES_PREFIX) or data.startswith(TEXT_PREFIX)
+
+
+def parse_strokes(data: str) -> Tuple[float, float, float, List[List[Point]]]:
+    """Decode stroke data into (width, height, pen_width, strokes of absolute points)."""
+    try:
+        header, *encoded = data[len(STROKES_PREFIX):].split(";")
+        width, height, pen = (float(v) for v in header.split(","))
+        strokes = []
+        for chunk in encoded:
+            values = [int(v) for v in chunk.split(",")]
+            if len(values) < 2 or len(values) % 2:
+                raise ValueError
+            x, y = values[0], values[1]
+            points = [(x, y)]
+            for i in range(2, len(values), 2):
+                x, y = x + values[i], y + values[i + 1]
+                points.append((x, y))
+            strokes.append(points)
+    except ValueError:
+        raise InvalidVectorSignature("Stroke data is malformed")
+    # float() accepts "nan", "inf" and "1e308", none of which can be drawn
+    if not all(math.isfinite(v) for v in (width, height, pen)):
+        raise InvalidVectorSignature("Stroke box and pen width must be finite numbers")
+    if width <= 0 or height <= 0 or pen <= 0:
+        raise InvalidVectorSignature("Stroke box and pen width must be positive")
+    if width > MAX_STROKE_BOX or height > MAX_STROKE_BOX or pen > MAX_PEN_WIDTH:
+        raise InvalidVectorSignature(f"Stroke box is limited to {MAX_STROKE_BOX} and pen width to {MAX_PEN_WIDTH}")
+    if any(abs(x) > MAX_STROKE_BOX or abs(y) > MAX_STROKE_BOX for points in strokes for x, y in points):
+        raise InvalidVectorSignature(f"Stroke points must lie within {MAX_STROKE_BOX} units")
+    return width, height, pen, strokes
+
+
+def encode_strokes(width: float, height: float, pen: float, strokes: List[List[Point]]) -> str:
+    def number(v: float) -> str:
+        return f"{v:g}"
+
+    parts = [f"{number(width)},{number(height)},{number(pen)}"]
+    for points in strokes:
+        (x, y), values = points[0], [points[0][0], points[0][1]]
+        for px, py in points[1:]:
+            values += [px - x, py - y]
+            x, y = px, py
+        parts.append(",".join(str(v) for v in values))
+    return STROKES_PREFIX + ";".join(parts)
+
+
+def normalize_strokes(data: str) -> str:
+    """
+    Validate stroke data and re-encode it canonically: repeated points are
+    dropped and the box is trimmed to the ink (plus half a pen width), the
+    vector equivalent of trimming transparent margins off a PNG.
+    """
+    _, _, pen, strokes = parse_strokes(data)
+    if not strokes:
+        raise InvalidVectorSignature("Signature has no strokes")
+    if len(strokes) > MAX_STROKES or sum(len(s) for s in strokes) > MAX_STROKE_POINTS:
+        raise InvalidVectorSignature("Signature has too many points")
+
+    cleaned = []
+    for points in strokes:
+        kept = [points[0]]
+        kept += [p for prev, p in zip(points, points[1:]) if p != prev]
+        cleaned.append(kept)
+
+    xs = [x for points in cleaned for x, _ in points]
+    ys = [y for points in cleaned for _, y in points]
+    pad = int(pen / 2 + 0.999)
+    left, top = min(xs) - pad, min(ys) - pad
+    width, height = max(xs) + pad - left, max(ys) + pad - top
+    shifted = [[(x - left, y - top) for x, y in points] for points in cleaned]
+    return encode_strokes(max(width, 1), max(height, 1), pen, shifted)
+
+
+def normalize_typed(data: str) -> str:
+    text = re.sub(r"\s+", " ", data[len(TEXT_PREFIX):]).strip()
+    if not text:
+        raise InvalidVectorSignature("Typed signature is empty")
+    if len(text) > MAX_TYPED_LENGTH:
+        raise InvalidVectorSignature(f"Typed signature must be at most {MAX_TYPED_LENGTH} characters")
+    if any(not ch.isprintable() for ch in text):
+        raise InvalidVectorSignature("Typed signature contains control characters")
+    return TEXT_PREFIX + text
+
+
+def normalize_vector_signature(data: str, signature_type: SignatureType) -> str:
+    """Validate vector signature data against its declared type and return the canonical form."""
+    if data.startswith(STROKES_PREFIX):
+        if signature_type != SignatureType.DRAWN:
+            raise InvalidVectorSignature("Stroke data is only accepted for drawn signatures")
+        return normalize_strokes(data)
+    if signature_type != SignatureType.TYPED:
+        raise InvalidVectorSignature("Text data is only accepted for typed signatures")
+    return normalize_typed(data)
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database and upload dir before anything imports it
+_tmp_dir = tempfile.mkdtemp(prefix="signflow-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp_dir, "uploads")
+os.environ["EVENTS_CHANNEL"] = "local"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ.pop("STORAGE_BACKEND", None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid  # noqa: E402
+import fitz  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+
+
+def make_pdf(pages: int = 1) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Agreement page {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def auth_headers(client):
+    email = f"user-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post("/api/auth/register", json={"email": email, "full_name": "Test User", "password": "pw123456"})
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def uploaded_doc(client, auth_headers):
+    response = client.post(
+        "/api/docs/upload", headers=auth_headers,
+        files={"file": ("agreement.pdf", make_pdf(), "application/pdf")},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
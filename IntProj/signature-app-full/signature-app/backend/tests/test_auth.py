@@ -0,0 +1,13 @@
+import uuid
+
+
+def test_register_pins_reads_but_login_does_not(client):
+    # Registering writes the user, so reads must see it; logging in writes nothing
+    credentials = {"email": f"user-{uuid.uuid4().hex[:8]}@example.com", "password": "pw123456"}
+    registered = client.post("/api/auth/register", json={**credentials, "full_name": "Test User"})
+    assert registered.status_code == 201
+    assert "x-read-after" in registered.headers
+
+    logged_in = client.post("/api/auth/login", json=credentials)
+    assert logged_in.status_code == 200
+    assert "x-read-after" not in logged_in.headers
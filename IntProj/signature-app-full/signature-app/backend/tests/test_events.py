@@ -0,0 +1,13 @@
+def test_event_stream_rejects_access_token(client, auth_headers):
+    access_token = auth_headers["Authorization"].split()[1]
+    response = client.get(f"/api/docs/events?token={access_token}")
+    assert response.status_code == 401
+
+
+def test_stream_token_is_not_a_bearer_token(client, auth_headers):
+    response = client.post("/api/docs/events/token", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    stream_token = response.json()["token"]
+
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {stream_token}"})
+    assert response.status_code == 401
@@ -0,0 +1,10 @@
+from routers._files import content_disposition
+
+
+def test_plain_filename_is_quoted_as_is():
+    assert content_disposition("contract.pdf") == 'attachment; filename="contract.pdf"'
+
+
+def test_unsafe_filename_is_percent_encoded():
+    header = content_disposition('Vertrag "Müller"\r\nX-Injected: 1.pdf')
+    assert header == "attachment; filename*=utf-8''Vertrag%20%22M%C3%BCller%22%0D%0AX-Injected%3A%201.pdf"
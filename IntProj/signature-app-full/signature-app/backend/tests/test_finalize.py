@@ -0,0 +1,47 @@
+from services.job_service import run_pending_jobs
+
+SIGNATURE = {
+    "signer_name": "Sam Signer",
+    "signer_email": "sam@example.com",
+    "signature_data": "text:Sam Signer",
+    "signature_type": "typed",
+    "page_number": 1,
+    "x_position": 10,
+    "y_position": 10,
+    "width": 30,
+    "height": 10,
+}
+
+
+def _sign_via_link(client, auth_headers, doc):
+    response = client.post("/api/docs/send-link", headers=auth_headers,
+                           json={"document_id": doc["id"], "signer_email": "sam@example.com"})
+    assert response.status_code == 200, response.text
+    response = client.post("/api/signatures/sign-with-token", params={"token": response.json()["signing_token"]},
+                           json={**SIGNATURE, "document_id": doc["id"]})
+    assert response.status_code == 200, response.text
+
+
+def test_link_signed_document_can_be_finalized(client, auth_headers, uploaded_doc):
+    _sign_via_link(client, auth_headers, uploaded_doc)
+    assert client.get(f"/api/docs/{uploaded_doc['id']}", headers=auth_headers).json()["status"] == "signed"
+
+    response = client.post("/api/signatures/finalize", headers=auth_headers, json={"document_id": uploaded_doc["id"]})
+    assert response.status_code == 202, response.text
+    run_pending_jobs()
+
+    job = client.get(f"/api/jobs/{response.json()['job_id']}", headers=auth_headers).json()
+    assert job["status"] == "succeeded"
+    signed = client.get(f"/api/docs/{uploaded_doc['id']}/download", params={"signed": "true"}, headers=auth_headers)
+    assert signed.status_code == 200
+    assert signed.content.startswith(b"%PDF")
+
+
+def test_second_finalize_after_signed_copy_exists_is_rejected(client, auth_headers, uploaded_doc):
+    _sign_via_link(client, auth_headers, uploaded_doc)
+    client.post("/api/signatures/finalize", headers=auth_headers, json={"document_id": uploaded_doc["id"]})
+    run_pending_jobs()
+
+    response = client.post("/api/signatures/finalize", headers=auth_headers, json={"document_id": uploaded_doc["id"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Document is already finalized"
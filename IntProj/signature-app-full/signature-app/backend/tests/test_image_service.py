@@ -0,0 +1,27 @@
+import base64
+import hashlib
+import io
+
+from PIL import Image
+
+from services import image_service
+
+
+def _png_base64() -> str:
+    img = Image.new("RGBA", (400, 200), (0, 0, 0, 0))
+    for x in range(50, 350):
+        img.putpixel((x, 100), (0, 0, 0, 255))
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    return base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def test_cache_is_keyed_by_image_content_not_the_upload_string():
+    image_service._cache.clear()
+    data = _png_base64()
+    first = image_service.normalize_signature_image(data, 100, 40)
+    second = image_service.normalize_signature_image("data:image/png;base64," + data, 100, 40)
+
+    assert first == second
+    digest = hashlib.sha256(base64.b64decode(data)).hexdigest()
+    assert list(image_service._cache) == [(digest, *image_service.target_pixel_size(100, 40))]
@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import SessionLocal
+from models.job import Job, JobStatus
+from services.job_service import (
+    JOB_LEASE_SECONDS, IdempotencyConflict, claim_next_job, enqueue_job, fail_abandoned_jobs,
+)
+
+
+def _abandoned_job(document_id: str, attempts: int) -> str:
+    db = SessionLocal()
+    try:
+        job = Job(
+            job_type="finalize", document_id=document_id, dedupe_key=f"finalize:{document_id}",
+            status=JobStatus.RUNNING, attempts=attempts, max_attempts=3,
+            locked_by="dead-worker", locked_at=datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS + 60),
+            run_after=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def _job(job_id: str) -> Job:
+    db = SessionLocal()
+    try:
+        return db.query(Job).filter(Job.id == job_id).one()
+    finally:
+        db.close()
+
+
+def test_stale_job_with_attempts_left_is_reclaimed(uploaded_doc):
+    job_id = _abandoned_job(uploaded_doc["id"], attempts=1)
+    db = SessionLocal()
+    try:
+        claimed = claim_next_job(db, "live-worker")
+    finally:
+        db.close()
+    assert claimed is not None and claimed.id == job_id
+    assert claimed.attempts == 2 and claimed.locked_by == "live-worker"
+
+
+def test_stale_job_on_last_attempt_is_failed_not_reclaimed(uploaded_doc):
+    job_id = _abandoned_job(uploaded_doc["id"], attempts=3)
+    db = SessionLocal()
+    try:
+        assert claim_next_job(db, "live-worker") is None
+    finally:
+        db.close()
+
+    assert fail_abandoned_jobs() == 1
+    job = _job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.dedupe_key is None
+    assert fail_abandoned_jobs() == 0
+
+
+def test_racing_idempotency_key_for_another_document_conflicts():
+    # Calls enqueue_job directly, as a request that got past the router's pre-read would
+    key = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        job, created = enqueue_job(db, "finalize", document_id="doc-a", user_id="user-1", idempotency_key=key)
+        assert created
+        again, created = enqueue_job(db, "finalize", document_id="doc-a", user_id="user-1", idempotency_key=key)
+        assert (again.id, created) == (job.id, False)
+        with pytest.raises(IdempotencyConflict):
+            enqueue_job(db, "finalize", document_id="doc-b", user_id="user-1", idempotency_key=key)
+    finally:
+        db.close()
@@ -0,0 +1,66 @@
+import base64
+import io
+
+import fitz
+import pytest
+from PIL import Image
+
+from models.signature import Signature
+from services.pdf_service import embed_signatures_into_pdf, extract_page_geometry, signature_rect_on_page
+
+
+def _pdf(rotation: int, cropbox: str) -> bytes:
+    doc = fitz.open()
+    page = doc.new_page(width=600, height=800)
+    doc.xref_set_key(page.xref, "MediaBox", "[50 100 650 900]")
+    doc.xref_set_key(page.xref, "CropBox", cropbox)
+    doc[0].set_rotation(rotation)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _black_png() -> str:
+    out = io.BytesIO()
+    Image.new("RGB", (40, 20), (0, 0, 0)).save(out, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def _ink_bbox(path: str) -> tuple:
+    pix = fitz.open(path)[0].get_pixmap(dpi=72)
+    samples = pix.samples
+    xs, ys = [], []
+    for i in range(0, len(samples), pix.n):
+        if samples[i] < 100:
+            xs.append((i // pix.n) % pix.width)
+            ys.append((i // pix.n) // pix.width)
+    return (min(xs), min(ys), max(xs) + 1, max(ys) + 1) if xs else None
+
+
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+@pytest.mark.parametrize("cropbox", ["[50 100 650 900]", "[100 200 500 870]"])
+def test_signature_lands_where_it_was_placed_on_the_displayed_page(tmp_path, rotation, cropbox):
+    source = tmp_path / "in.pdf"
+    source.write_bytes(_pdf(rotation, cropbox))
+    geometry = extract_page_geometry(str(source))
+    page = geometry[0]
+    signature = Signature(
+        signature_data=_black_png(), page_number=1,
+        x_position=10, y_position=20, width=25, height=5,
+    )
+
+    output = str(tmp_path / "out.pdf")
+    assert embed_signatures_into_pdf(str(source), output, [signature], geometry)
+
+    # The image keeps its aspect ratio, so it is centred in the box rather than filling it
+    box = fitz.Rect(0.10 * page["width"], 0.20 * page["height"], 0.35 * page["width"], 0.25 * page["height"])
+    ink = fitz.Rect(_ink_bbox(output))
+    assert abs(ink.x0 + ink.x1 - box.x0 - box.x1) <= 2 and abs(ink.y0 + ink.y1 - box.y0 - box.y1) <= 2
+    assert ink.width > ink.height and ink in box + (-1, -1, 1, 1)
+
+
+def test_signature_rect_is_in_pdf_user_space():
+    # /Rotate 90 with the cropbox 100pt in from the mediabox's left and 30pt down from its top
+    page = {"width": 670, "height": 400, "rotation": 90, "mediabox": [50, 100, 650, 900], "cropbox_offset": [50, 30]}
+    rect = signature_rect_on_page(page, 0, 0, 10, 10)
+    assert rect == fitz.Rect(100, 200, 140, 267)
@@ -0,0 +1,17 @@
+import io
+
+from PIL import Image
+
+
+def test_typed_preview_is_rendered_by_the_server(client):
+    r = client.get("/api/signatures/typed-preview", params={"text": "Jane  Doe"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/png"
+    image = Image.open(io.BytesIO(r.content)).convert("L")
+    assert image.getextrema()[0] < 128  # Some ink was drawn
+
+
+def test_typed_preview_rejects_text_the_font_cannot_render(client):
+    r = client.get("/api/signatures/typed-preview", params={"text": "日本"})
+    assert r.status_code == 422
+    assert "can't render" in r.json()["detail"]
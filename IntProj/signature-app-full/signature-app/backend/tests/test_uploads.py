@@ -0,0 +1,42 @@
+import hashlib
+
+from conftest import make_pdf
+from services.chunked_upload_service import MIN_CHUNK_SIZE
+
+
+def _upload_in_chunks(client, auth_headers, data: bytes, **session_fields):
+    response = client.post("/api/uploads", headers=auth_headers, json={
+        "filename": "bundle.pdf", "total_size": len(data), "chunk_size": MIN_CHUNK_SIZE, **session_fields,
+    })
+    assert response.status_code == 201, response.text
+    session = response.json()
+    for index in reversed(range(session["total_chunks"])):
+        chunk = data[index * MIN_CHUNK_SIZE:(index + 1) * MIN_CHUNK_SIZE]
+        response = client.put(f"/api/uploads/{session['upload_id']}/chunks/{index}", headers=auth_headers, content=chunk)
+        assert response.status_code == 204, response.text
+    return client.post(f"/api/uploads/{session['upload_id']}/complete", headers=auth_headers)
+
+
+def _padded_pdf() -> bytes:
+    return make_pdf() + b"%" + b"x" * MIN_CHUNK_SIZE + b"\n"
+
+
+def test_chunked_upload_without_checksum(client, auth_headers):
+    response = _upload_in_chunks(client, auth_headers, _padded_pdf())
+    assert response.status_code == 200, response.text
+
+
+def test_chunked_upload_checksum_is_verified(client, auth_headers):
+    data = _padded_pdf()
+    response = _upload_in_chunks(client, auth_headers, data, checksum_sha256=hashlib.sha256(b"other").hexdigest())
+    assert response.status_code == 422
+
+    response = _upload_in_chunks(client, auth_headers, data, checksum_sha256=hashlib.sha256(data).hexdigest())
+    assert response.status_code == 200, response.text
+
+
+def test_malformed_checksum_is_rejected(client, auth_headers):
+    response = client.post("/api/uploads", headers=auth_headers, json={
+        "filename": "bundle.pdf", "total_size": 10, "checksum_sha256": "not-a-digest",
+    })
+    assert response.status_code == 422
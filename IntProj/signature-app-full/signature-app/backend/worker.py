@@ -0,0 +1,21 @@
+"""
+Standalone job worker. Run any number of these, on any node sharing the
+database and storage backend:
+
+    python worker.py
+"""
+import models  # noqa: F401  Registers all tables/relationships
+from database import create_tables
+from services.job_service import run_worker
+from services.search_service import backfill_search_index
+
+
+if __name__ == "__main__":
+    create_tables()
+    indexed = backfill_search_index()
+    if indexed:
+        print(f"🔎 Indexed {indexed} document(s) for search")
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        print("🛑 Worker stopped")
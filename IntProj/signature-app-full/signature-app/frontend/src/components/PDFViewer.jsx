@@ -7,8 +7,8 @@ import { useState, useRef } from 'react'
 function MockPDFContent() {
   return (
     <div
-      className="w-full bg-white rounded shadow-2xl"
-      style={{ color: '#333', fontFamily: 'Georgia, serif', fontSize: 13, lineHeight: 1.8, padding: '3rem', minHeight: 700 }}
+      className="w-full h-full bg-white rounded shadow-2xl overflow-hidden"
+      style={{ color: '#333', fontFamily: 'Georgia, serif', fontSize: 13, lineHeight: 1.8, padding: '3rem' }}
     >
       <h2 style={{ fontSize: 18, textAlign: 'center', marginBottom: '1.5rem', color: '#111' }}>
         EMPLOYMENT AGREEMENT
@@ -56,21 +56,25 @@ function MockPDFContent() {
   )
 }
 
-export default function PDFViewer({ docName, onPlaceSignature, signatures, onRemoveSignature }) {
-  const wrapRef = useRef(null)
+// Until /pages has loaded, lay the page out as US Letter
+const FALLBACK_PAGE = { width: 612, height: 792 }
+
+export default function PDFViewer({ docName, pages = [], onPlaceSignature, signatures, onRemoveSignature }) {
+  const pageRef = useRef(null)
   const [page, setPage] = useState(1)
-  const totalPages = 1 // Update when wiring real PDF
+  const totalPages = pages.length || 1
+  // Displayed size from /api/docs/{id}/pages (already swapped for rotated pages)
+  const { width, height } = pages[page - 1] || FALLBACK_PAGE
 
   const handleClick = (e) => {
-    const wrap = wrapRef.current
-    if (!wrap) return
-    // Only place if click is on the PDF content itself
-    if (e.target === wrap || wrap.contains(e.target)) {
-      const rect = wrap.getBoundingClientRect()
-      const x = e.clientX - rect.left + wrap.scrollLeft
-      const y = e.clientY - rect.top + wrap.scrollTop
-      onPlaceSignature?.({ x, y, page })
-    }
+    const el = pageRef.current
+    if (!el || !pages.length) return
+    // Positions are percentages of the page as displayed, so they hold at any zoom
+    const rect = el.getBoundingClientRect()
+    const x = ((e.clientX - rect.left) / rect.width) * 100
+    const y = ((e.clientY - rect.top) / rect.height) * 100
+    if (x < 0 || x > 100 || y < 0 || y > 100) return
+    onPlaceSignature?.({ x, y, page })
   }
 
   return (
@@ -98,24 +102,26 @@ export default function PDFViewer({ docName, onPlaceSignature, signatures, onRem
 
       {/* PDF Area */}
       <div
-        ref={wrapRef}
         className="flex-1 overflow-auto flex items-start justify-center p-6 cursor-crosshair relative"
-        onClick={handleClick}
         style={{ position: 'relative' }}
       >
-        <div style={{ position: 'relative', width: '100%', maxWidth: 600 }}>
+        <div
+          ref={pageRef}
+          onClick={handleClick}
+          style={{ position: 'relative', width: '100%', maxWidth: 600, aspectRatio: `${width} / ${height}` }}
+        >
           <MockPDFContent />
 
           {/* Signature fields overlay */}
-          {signatures.map((sig) => (
+          {signatures.filter((sig) => sig.page === page).map((sig) => (
             <div
               key={sig.id}
               style={{
                 position: 'absolute',
-                left: sig.x,
-                top: sig.y,
-                width: sig.w || 160,
-                height: sig.h || 60,
+                left: `${sig.x}%`,
+                top: `${sig.y}%`,
+                width: `${sig.w}%`,
+                height: `${sig.h}%`,
                 border: '2px solid #52c278',
                 borderRadius: 4,
                 background: 'rgba(82,194,120,0.08)',
@@ -127,7 +133,7 @@ export default function PDFViewer({ docName, onPlaceSignature, signatures, onRem
               onClick={(e) => e.stopPropagation()}
             >
               <img
-                src={sig.data}
+                src={sig.preview}
                 alt="signature"
                 style={{ width: '100%', height: '100%', objectFit: 'contain', padding: 4 }}
               />
@@ -1,22 +1,54 @@
 import { useRef, useEffect, useState } from 'react'
+import { sigApi } from '../utils/api'
 
+// Strokes are recorded at this multiple of canvas pixels so the vector data keeps sub-pixel detail
+const STROKE_SCALE = 4
+const PEN_WIDTH = 2.5
+// Typed previews are rendered by the API in its signature font; wait for a pause in typing
+const PREVIEW_DELAY_MS = 300
+
+// Compact vector format understood by the API: "strokes:{w},{h},{pen};{x},{y},{dx},{dy},...;..."
+const encodeStrokes = (strokes, width, height) => {
+  const encoded = strokes.map((points) => {
+    const values = [points[0].x, points[0].y]
+    for (let i = 1; i < points.length; i++) {
+      values.push(points[i].x - points[i - 1].x, points[i].y - points[i - 1].y)
+    }
+    return values.join(',')
+  })
+  const header = [width * STROKE_SCALE, height * STROKE_SCALE, PEN_WIDTH * STROKE_SCALE].join(',')
+  return `strokes:${header};${encoded.join(';')}`
+}
+
+// onCapture receives { data, type, preview }: vector data for the API plus a PNG for on-screen preview
 export default function SignatureCanvas({ onCapture }) {
   const canvasRef = useRef(null)
   const [drawing, setDrawing] = useState(false)
   const [tab, setTab] = useState('draw')
   const [typedName, setTypedName] = useState('')
+  const [previewName, setPreviewName] = useState('')
+  const [previewError, setPreviewError] = useState(false)
   const lastPos = useRef({ x: 0, y: 0 })
+  const strokes = useRef([])
 
   useEffect(() => {
     const canvas = canvasRef.current
     if (!canvas) return
     const ctx = canvas.getContext('2d')
     ctx.strokeStyle = '#1a1510'
-    ctx.lineWidth = 2.5
+    ctx.lineWidth = PEN_WIDTH
     ctx.lineCap = 'round'
     ctx.lineJoin = 'round'
   }, [])
 
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setPreviewName(typedName.trim())
+      setPreviewError(false)
+    }, PREVIEW_DELAY_MS)
+    return () => clearTimeout(timer)
+  }, [typedName])
+
   const getPos = (e) => {
     const rect = canvasRef.current.getBoundingClientRect()
     const clientX = e.touches ? e.touches[0].clientX : e.clientX
@@ -27,10 +59,13 @@ export default function SignatureCanvas({ onCapture }) {
     }
   }
 
+  const toStrokePoint = ({ x, y }) => ({ x: Math.round(x * STROKE_SCALE), y: Math.round(y * STROKE_SCALE) })
+
   const startDraw = (e) => {
     e.preventDefault()
     setDrawing(true)
     lastPos.current = getPos(e)
+    strokes.current.push([toStrokePoint(lastPos.current)])
   }
 
   const draw = (e) => {
@@ -44,6 +79,7 @@ export default function SignatureCanvas({ onCapture }) {
     ctx.lineTo(pos.x, pos.y)
     ctx.stroke()
     lastPos.current = pos
+    strokes.current[strokes.current.length - 1].push(toStrokePoint(pos))
   }
 
   const stopDraw = () => setDrawing(false)
@@ -52,27 +88,23 @@ export default function SignatureCanvas({ onCapture }) {
     const canvas = canvasRef.current
     const ctx = canvas.getContext('2d')
     ctx.clearRect(0, 0, canvas.width, canvas.height)
+    strokes.current = []
   }
 
   const captureDrawn = () => {
     const canvas = canvasRef.current
-    const data = canvas.toDataURL('image/png')
-    onCapture(data)
+    if (strokes.current.length === 0) return
+    onCapture({
+      data: encodeStrokes(strokes.current, canvas.width, canvas.height),
+      type: 'drawn',
+      preview: canvas.toDataURL('image/png'),
+    })
   }
 
   const captureTyped = () => {
-    if (!typedName.trim()) return
-    const offCanvas = document.createElement('canvas')
-    offCanvas.width = 400
-    offCanvas.height = 120
-    const ctx = offCanvas.getContext('2d')
-    ctx.fillStyle = 'white'
-    ctx.fillRect(0, 0, 400, 120)
-    ctx.fillStyle = '#1a1510'
-    ctx.font = '64px Fraunces, serif'
-    ctx.textBaseline = 'middle'
-    ctx.fillText(typedName, 16, 60)
-    onCapture(offCanvas.toDataURL('image/png'))
+    const name = typedName.trim()
+    if (!name || previewError) return
+    onCapture({ data: `text:${name}`, type: 'typed', preview: sigApi.typedPreviewUrl(name) })
   }
 
   return (
@@ -129,11 +161,22 @@ export default function SignatureCanvas({ onCapture }) {
             placeholder="Type your full name..."
             className="input mb-2"
           />
-          {/* Preview */}
+          {/* Preview, rendered by the API exactly as it will be embedded */}
           <div className="bg-white rounded-md px-4 py-2 text-center min-h-[60px] flex items-center justify-center mb-2">
-            <span style={{ fontFamily: 'Fraunces, serif', fontSize: '2rem', color: '#1a1510' }}>
-              {typedName || 'Your Name'}
-            </span>
+            {previewError ? (
+              <span className="text-xs text-red-600">
+                The signature font can't render some of these characters — draw your signature instead
+              </span>
+            ) : previewName ? (
+              <img
+                src={sigApi.typedPreviewUrl(previewName)}
+                alt="Typed signature preview"
+                className="h-12 object-contain"
+                onError={() => setPreviewError(true)}
+              />
+            ) : (
+              <span className="text-sm text-gray-400">Your Name</span>
+            )}
           </div>
           <button className="btn btn-gold btn-sm w-full" onClick={captureTyped}>
             ✓ Use This Signature
@@ -25,6 +25,43 @@ export default function Dashboard() {
 
   useEffect(() => { fetchDocs() }, [])
 
+  // Live status updates (sent / signed / finalized / expired) pushed by the server
+  useEffect(() => {
+    let source = null
+    let retry = null
+    let stopped = false
+    let lastEventId = null
+    const onStatus = (e) => {
+      lastEventId = e.lastEventId || lastEventId
+      const { document_id, status } = JSON.parse(e.data)
+      setDocs((prev) => prev.map((d) => (d.id === document_id && status ? { ...d, status } : d)))
+    }
+    const types = ['sent', 'signed', 'finalized', 'finalize_failed', 'expired']
+    const connect = async () => {
+      try {
+        source = await docsApi.events(lastEventId)
+      } catch {
+        retry = setTimeout(connect, 5000)
+        return
+      }
+      if (stopped) return source.close()
+      types.forEach((t) => source.addEventListener(t, onStatus))
+      // Sent when the server can't replay what we missed (e.g. a dev server restarted)
+      source.addEventListener('reset', fetchDocs)
+      // The browser retries dropped streams itself, but once the stream token
+      // has expired the retry is refused and a new token is needed
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) retry = setTimeout(connect, 2000)
+      }
+    }
+    connect()
+    return () => {
+      stopped = true
+      clearTimeout(retry)
+      source?.close()
+    }
+  }, [])
+
   const handleDelete = async (id) => {
     if (!confirm('Delete this document? This cannot be undone.')) return
     try {
@@ -40,8 +77,8 @@ export default function Dashboard() {
     try {
       const { data } = await docsApi.download(doc.id, doc.status === 'signed')
       downloadBlob(data, doc.status === 'signed' ? `signed_${doc.filename}` : doc.filename)
-    } catch {
-      toast.error('Download failed')
+    } catch (err) {
+      toast.error(err.response?.status === 409 ? 'Signed PDF not generated yet — finalize the document first' : 'Download failed')
     }
   }
 
@@ -27,8 +27,8 @@ export default function PublicSign() {
         document_id: '',      // filled by backend using token
         signer_name: signerName,
         signer_email: signerEmail,
-        signature_type: 'drawn',
-        signature_data: signatureData,
+        signature_type: signatureData.type,
+        signature_data: signatureData.data,
         page_number: 1,
         x_position: 10,
         y_position: 70,
@@ -102,7 +102,7 @@ export default function PublicSign() {
             <div className="mb-4 bg-surface2 border border-border2 rounded-lg p-3">
               <div className="text-xs text-muted mb-1">Signature preview:</div>
               <div className="bg-white rounded p-2">
-                <img src={signatureData} alt="sig preview" className="h-12 object-contain" />
+                <img src={signatureData.preview} alt="sig preview" className="h-12 object-contain" />
               </div>
             </div>
           )}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import toast from 'react-hot-toast'
-import { docsApi, sigApi } from '../utils/api'
+import { docsApi, sigApi, jobsApi } from '../utils/api'
 import { downloadBlob } from '../utils/helpers'
 import PageHeader from '../components/PageHeader'
 import PDFViewer from '../components/PDFViewer'
@@ -9,10 +9,29 @@ import SignatureCanvas from '../components/SignatureCanvas'
 import Modal from '../components/Modal'
 import Spinner from '../components/Spinner'
 
+const JOB_POLL_MS = 1000
+const JOB_WAIT_MS = 60000
+
+// Signature box in PDF points (about 2.2in x 0.8in), whatever the page size
+const SIG_WIDTH_PT = 160
+const SIG_HEIGHT_PT = 60
+
+// Finalize runs as a background job; resolves with the finished job, or null if it is still queued
+async function waitForJob(jobId) {
+  const deadline = Date.now() + JOB_WAIT_MS
+  while (Date.now() < deadline) {
+    const { data } = await jobsApi.get(jobId)
+    if (data.status === 'succeeded' || data.status === 'failed') return data
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS))
+  }
+  return null
+}
+
 export default function Sign() {
   const { docId } = useParams()
   const navigate = useNavigate()
   const [doc, setDoc] = useState(null)
+  const [pages, setPages] = useState([])
   const [loading, setLoading] = useState(true)
   const [signatureData, setSignatureData] = useState(null)
   const [placedSigs, setPlacedSigs] = useState([])
@@ -30,8 +49,9 @@ export default function Sign() {
   useEffect(() => {
     const fetchDoc = async () => {
       try {
-        const { data } = await docsApi.get(docId)
+        const [{ data }, { data: geometry }] = await Promise.all([docsApi.get(docId), docsApi.pages(docId)])
         setDoc(data)
+        setPages(geometry.pages)
       } catch {
         toast.error('Document not found')
         navigate('/dashboard')
@@ -47,19 +67,25 @@ export default function Sign() {
     toast.success('Signature ready! Click the document to place it ✓')
   }
 
+  // x / y arrive as percentages of the displayed page, which is what the API stores
   const handlePlaceSignature = ({ x, y, page }) => {
     if (!signatureData) {
       toast.error('Create a signature first, then click the document to place it')
       return
     }
+    const { width, height } = pages[page - 1]
+    const w = (SIG_WIDTH_PT / width) * 100
+    const h = (SIG_HEIGHT_PT / height) * 100
     const newSig = {
       id: `sig-${Date.now()}`,
-      x: x - 80, // center horizontally
-      y: y - 30, // center vertically
-      w: 160,
-      h: 60,
+      x: Math.min(Math.max(x - w / 2, 0), 100 - w), // centered on the click, kept on the page
+      y: Math.min(Math.max(y - h / 2, 0), 100 - h),
+      w,
+      h,
       page,
-      data: signatureData,
+      data: signatureData.data,
+      type: signatureData.type,
+      preview: signatureData.preview,
     }
     setPlacedSigs((prev) => [...prev, newSig])
     setSignatureData(null)
@@ -82,18 +108,25 @@ export default function Sign() {
         await sigApi.create({
           document_id: docId,
           signature_data: sig.data,
-          signature_type: 'drawn',
+          signature_type: sig.type,
           page_number: sig.page,
-          x_position: (sig.x / 600) * 100,
-          y_position: (sig.y / 800) * 100,
-          width: (sig.w / 600) * 100,
-          height: (sig.h / 800) * 100,
+          x_position: sig.x,
+          y_position: sig.y,
+          width: sig.w,
+          height: sig.h,
         })
       }
-      // Finalize
-      await sigApi.finalize(docId)
-      setFinalizeOpen(true)
-      toast.success('Document finalized!')
+      // Finalize, then wait for the worker to produce the signed PDF
+      const { data: accepted } = await sigApi.finalize(docId)
+      const job = await waitForJob(accepted.job_id)
+      if (!job) {
+        toast('Finalize is still queued — the signed PDF will appear on the dashboard once a worker picks it up', { icon: '⏳' })
+      } else if (job.status === 'failed') {
+        toast.error(job.last_error || 'Finalization failed')
+      } else {
+        setFinalizeOpen(true)
+        toast.success('Document finalized!')
+      }
     } catch (err) {
       toast.error(err.response?.data?.detail || 'Finalization failed')
     } finally {
@@ -186,6 +219,7 @@ export default function Sign() {
         {/* PDF */}
         <PDFViewer
           docName={doc?.filename}
+          pages={pages}
           signatures={placedSigs}
           onPlaceSignature={handlePlaceSignature}
           onRemoveSignature={handleRemoveSig}
@@ -203,7 +237,7 @@ export default function Sign() {
             </p>
             {signatureData && (
               <div className="mb-3 bg-white rounded p-2">
-                <img src={signatureData} alt="preview" className="w-full h-12 object-contain" />
+                <img src={signatureData.preview} alt="preview" className="w-full h-12 object-contain" />
               </div>
             )}
             <SignatureCanvas onCapture={handleCapture} />
@@ -226,7 +260,7 @@ export default function Sign() {
                     className="flex items-center gap-2 p-2 bg-surface2 rounded-lg border border-border"
                   >
                     <img
-                      src={sig.data}
+                      src={sig.preview}
                       alt="sig"
                       className="w-16 h-8 object-contain bg-white rounded"
                     />
@@ -13,12 +13,21 @@ api.interceptors.request.use((config) => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`
   }
+  // Echo the last read-after token so reads right after a write skip the lagging replica on any server
+  const readAfter = localStorage.getItem('readAfter')
+  if (readAfter) {
+    config.headers['X-Read-After'] = readAfter
+  }
   return config
 })
 
 // Handle 401 globally — clear token and redirect
 api.interceptors.response.use(
-  (res) => res,
+  (res) => {
+    const readAfter = res.headers['x-read-after']
+    if (readAfter) localStorage.setItem('readAfter', readAfter)
+    return res
+  },
   (err) => {
     if (err.response?.status === 401) {
       localStorage.removeItem('token')
@@ -44,10 +53,18 @@ export const docsApi = {
     }),
   list: () => api.get('/api/docs'),
   get: (id) => api.get(`/api/docs/${id}`),
+  pages: (id) => api.get(`/api/docs/${id}/pages`),
   download: (id, signed = false) =>
     api.get(`/api/docs/${id}/download?signed=${signed}`, { responseType: 'blob' }),
   sendLink: (data) => api.post('/api/docs/send-link', data),
   delete: (id) => api.delete(`/api/docs/${id}`),
+  // EventSource can't send headers, so it gets a short-lived stream token in the query string
+  events: async (lastEventId) => {
+    const { data } = await api.post('/api/docs/events/token')
+    const params = new URLSearchParams({ token: data.token })
+    if (lastEventId) params.set('last_event_id', lastEventId)
+    return new EventSource(`${BASE_URL}/api/docs/events?${params}`)
+  },
 }
 
 // ── Signatures ────────────────────────────────────────
@@ -57,6 +74,13 @@ export const sigApi = {
   finalize: (documentId) => api.post('/api/signatures/finalize', { document_id: documentId }),
   signWithToken: (token, data) =>
     api.post(`/api/signatures/sign-with-token?token=${token}`, data),
+  // Plain URL so it can be an <img> src; public, like signing links
+  typedPreviewUrl: (text) => `${BASE_URL}/api/signatures/typed-preview?${new URLSearchParams({ text })}`,
+}
+
+// ── Jobs ──────────────────────────────────────────────
+export const jobsApi = {
+  get: (id) => api.get(`/api/jobs/${id}`),
 }
 
 // ── Audit ─────────────────────────────────────────────